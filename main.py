@@ -6,14 +6,24 @@ from io import BytesIO
 from pathlib import Path
 from zipfile import ZipFile
 
-import requests
 from bs4 import BeautifulSoup
 
 import scrapers as sps
+from utilities.concurrency_controller import ConcurrencyController
+from utilities.crawl_state import CrawlState
+from utilities.download_scheduler import DownloadScheduler
 from utilities.downloader import DownloadOptions, YouTubeDownloader, ScrapperDownloader
+from utilities.file_transfer import FileTransfer
+from utilities.http_client import HTTPClient
 from utilities.logger_setup import setup_logging
+from utilities.media_link_cache import MediaLinkCache
+from utilities.name_archive import NameArchive
+from utilities.page_cache import PageCache
+from utilities.page_fetcher import PageFetcher
 from utilities.proxy_request import RotatingProxiesRequest
 from utilities.telegram_bot import TelegramBot
+from utilities.title_cache import TitleCache
+from utilities.title_matcher import TitleMatcher
 from utilities.url_manager import URLManager
 from youtube import YouTube
 
@@ -41,7 +51,7 @@ def set_ffmpeg_bin(ffmpeg_dir: Path) -> Path:
     else:
         ffmpeg_link = "https://github.com/yt-dlp/FFmpeg-Builds/releases/" \
                       "download/latest/ffmpeg-master-latest-win64-gpl.zip"
-        zip_data = requests.get(ffmpeg_link)
+        zip_data = HTTPClient.get_session().get(ffmpeg_link)
         with ZipFile(BytesIO(zip_data.content)) as zip_file:
             zip_file.extractall(ffmpeg_dir)
             namelist = zip_file.namelist()  # Get the names of all the files and directories in the zip.
@@ -63,7 +73,7 @@ def get_yt_channel_id(url: str) -> None:
     """
     Use link from YouTube channel page to get the channel id.
     """
-    response = requests.get(url)
+    response = HTTPClient.get_session().get(url)
     soup = BeautifulSoup(response.text, "html.parser")
     # print(soup.prettify())
     channel_id_link = soup.find('link', {"title": "RSS"})
@@ -75,7 +85,7 @@ def get_yt_channel_id(url: str) -> None:
         print("Could not find channel id link. URL must be from the channel page!")
 
 
-def run_youtube_api(yt_dl_archive_file: Path, resolved_names_file: Path, anime_list: list, tb: TelegramBot) -> None:
+def run_youtube_api(yt_dl_archive_file: Path, name_archive: NameArchive, anime_list: list, tb: TelegramBot) -> None:
     # Variables
     playlist_id = "PLdUiOF8vZ51jW1w84E01SGY2KNeOEPZBn"
     # YouTube Channel IDs ordering determines priority when matching videos.
@@ -107,7 +117,7 @@ def run_youtube_api(yt_dl_archive_file: Path, resolved_names_file: Path, anime_l
     yd = YouTubeDownloader(yt_dl_archive_file)
     try:
         logger.info("Checking YouTube site for recent anime upload matches...")
-        youtube = YouTube(playlist_id, resolved_names_file)
+        youtube = YouTube(playlist_id, name_archive)
         youtube.clear_playlist()
         youtube.match_to_youtube_videos(list(dict.fromkeys(youtube_channel_ids)), anime_list)  # ids will be unique
         time.sleep(30)  # Prevents skipped downloads by giving YouTube time to added videos the playlist.
@@ -134,8 +144,15 @@ def scrapper_anime_list(youtube_only_file: Path, anime_list: list) -> list:
         return anime_list
 
 
-def run_scrappers(resolved_names_file: Path, tb: TelegramBot) -> None:
-    um, sd = URLManager(), ScrapperDownloader(resolved_names_file)
+def run_scrappers(name_archive: NameArchive, tb: TelegramBot) -> None:
+    """
+    Scrape the sites one after another while the downloads of the sites already scrapped run in the background.
+    """
+    um = URLManager()
+    # The download limits shared by all the sites are adjusted from the measured throughput.
+    controller = ConcurrencyController(min_concurrent_dl=2, max_concurrent_dl=16, max_host_dl=6, start_concurrent_dl=6)
+    DownloadOptions.throughput_monitor = controller
+    scheduler = DownloadScheduler(controller.max_limit, controller.max_host_limit, controller)
     scrappers = {
         "xiaobaotv.net": "XiaobaotvScraper",
         "yhdm.in": "YhdmScrapper",
@@ -149,20 +166,20 @@ def run_scrappers(resolved_names_file: Path, tb: TelegramBot) -> None:
             site_address = um.check_url(site_address)
             logger.info(f"Checking {site_address} site for recent anime upload matches...")
             scrapper = getattr(sps, scrapper_class)(site_address)
-            site_posts = scrapper.get_anime_posts()
-            site_posts.update(scrapper.get_anime_posts(page=2))
-            site_posts.update(scrapper.get_anime_posts(page=3))
+            site_posts = scrapper.get_recent_anime_posts()
             matched_posts = scrapper.match_to_recent_videos(site_posts)
             matched_download_details = scrapper.get_recent_posts_videos_download_link(matched_posts)
-            sd.batch_downloader(site_address, matched_download_details, 6)
+            scheduler.submit_batch(site_address, ScrapperDownloader(name_archive), matched_download_details)
         except Exception as error:
             error_message = f"An error occurred while running {site_address} site scrapper! \nError: {error}"
             logger.exception(error_message)
             tb.send_telegram_message(error_message)
+    logger.info("..........Waiting for queued downloads to finish..........")
+    scheduler.wait()
 
 
 def m3u8_video_downloader() -> None:
-    sd = ScrapperDownloader(Path(""))
+    sd = ScrapperDownloader(None)
     video_name = ""
     video_link = ""
     sd.video_downloader("", (video_name, video_link))
@@ -173,18 +190,24 @@ def main() -> None:
     set_credentials()
     # Variables
     start = time.perf_counter()
+    headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+                             "Chrome/127.0.0.0 Safari/537.36"}
+    HTTPClient.headers = headers  # Set before the shared session is first used.
     # Set directory files.
     download_dir = Path(r"\\192.168.31.111\General File Sharing\From YouTube\Chinese Anime For Subbing")
     destination_dir, project_files = download_dir / "##Currently Airing", download_dir / "Project Files"
     project_files.mkdir(exist_ok=True)
     ffmpeg_bin_dir, proxy_file = set_ffmpeg_bin(project_files / "ffmpeg"), project_files / "proxies.txt"
-    resolved_names_file = project_files / "resolved_names_dl_archive.txt"
+    resolved_names_file = project_files / "resolved_names_dl_archive.txt"  # Only read to migrate the old archive.
     yt_dl_archive_file = project_files / "yt_dlp_archive.txt"
     youtube_only_file, url_data_file = project_files / "youtube_only.txt", project_files / "url_data.json"
-    resolved_names_file.touch(exist_ok=True)
+    name_archive = NameArchive(project_files / "resolved_names_dl_archive.db", resolved_names_file)
+    # Caches and crawl state kept across runs are on local disk in one folder that is not tracked by git.
+    state_dir = Path("state")
+    state_dir.mkdir(exist_ok=True)
+    # Resolved names are shared by YouTube and the scrappers.
+    YouTube.title_cache = sps.ScrapperTools.title_cache = TitleCache(state_dir / "title_cache.json")
 
-    headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
-                             "Chrome/127.0.0.0 Safari/537.36"}
     anime_list = [keyword for folder in destination_dir.iterdir() for keyword in re.findall(r'\((.*?)\)', folder.name)]
 
     tb = TelegramBot()
@@ -193,18 +216,35 @@ def main() -> None:
     # Set download options.
     DownloadOptions.tb, DownloadOptions.download_path, DownloadOptions.timeout_secs = tb, download_dir, download_time()
     DownloadOptions.ffmpeg_path, DownloadOptions.min_res_height = ffmpeg_bin_dir, 720  # Minimum resolution height.
+    DownloadOptions.headers, DownloadOptions.segment_concurrency = headers, 8  # Segments fetched at a time per file.
+    # Scrapper downloads are written to local disk and moved to the share in the background.
+    DownloadOptions.staging_path, DownloadOptions.file_transfer = state_dir / "staging", FileTransfer(download_dir, 2)
+    DownloadOptions.file_transfer.resume(DownloadOptions.staging_path)
     # Set scrapper options.
     scrapper_list = scrapper_anime_list(youtube_only_file, anime_list)
     sps.ScrapperTools.tb, sps.ScrapperTools.current_date = tb, datetime.now().date()  # .replace(day=) to change day.
-    sps.ScrapperTools.headers, sps.ScrapperTools.anime_list = headers, scrapper_list
-    sps.ScrapperTools.resolved_names_file, sps.ScrapperTools.video_num_per_post = resolved_names_file, 8
+    sps.ScrapperTools.headers, sps.ScrapperTools.title_matcher = headers, TitleMatcher(scrapper_list)
+    sps.ScrapperTools.name_archive, sps.ScrapperTools.video_num_per_post = name_archive, 8
+    sps.ScrapperTools.listing_depth = 3  # Listing pages checked per site.
+    # Learned fetch modes and fetched pages are kept across runs. Posts with no new episodes are skipped.
+    page_cache = PageCache(state_dir / "page_cache")
+    sps.ScrapperTools.page_fetcher = PageFetcher(state_dir / "page_fetch_modes.json", page_cache=page_cache)
+    sps.ScrapperTools.crawl_state = CrawlState(state_dir / "crawl_state.json")
+    sps.ScrapperTools.media_link_cache = MediaLinkCache(state_dir / "media_links.json")  # Reused by retried episodes.
     # Set options for proxy.
     RotatingProxiesRequest.headers, RotatingProxiesRequest.proxy_file = headers, proxy_file
     # Run code to download new anime.
     # get_yt_channel_id("")
-    run_youtube_api(yt_dl_archive_file, resolved_names_file, anime_list, tb)
-    run_scrappers(resolved_names_file, tb)
-    sps.ScrapperTools.sel_driver.quit()
+    run_youtube_api(yt_dl_archive_file, name_archive, anime_list, tb)
+    run_scrappers(name_archive, tb)
+    sps.ScrapperTools.crawl_state.save()
+    sps.ScrapperTools.media_link_cache.save()
+    DownloadOptions.file_transfer.wait()
+    name_archive.close()
+    YouTube.title_cache.save()
+    sps.ScrapperTools.browser_pool.close()
+    sps.ScrapperTools.link_prober.close()
+    HTTPClient.close()
     # m3u8_video_downloader()
 
     logger.info(f"Total Runtime: {timedelta(seconds=round(time.perf_counter() - start))}")
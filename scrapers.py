@@ -1,16 +1,26 @@
 import logging
 import re
+import sys
 import time
-import winreg
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import cache
+from importlib.util import find_spec
+from threading import Lock, local
+from typing import Callable, Iterable
 
-import requests
 import undetected_chromedriver as uc
-from bs4 import BeautifulSoup
-from ch_title_gen import ChineseTitleGenerator
+from bs4 import BeautifulSoup, SoupStrainer
 from dateutil import parser
-from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
 
+from utilities.browser_pool import BrowserPool
+from utilities.crawl_state import CrawlState
+from utilities.http_client import HTTPClient
+from utilities.link_prober import LinkProber
+from utilities.media_link_cache import MediaLinkCache
+from utilities.page_fetcher import PageFetcher
 from utilities.proxy_request import RotatingProxiesRequest
+from utilities.title_cache import TitleCache
 
 logger = logging.getLogger(__name__)
 # Do not log this messages unless they are at least warnings
@@ -35,10 +45,14 @@ def suppress_uc_exception(uc_obj: uc) -> None:
 suppress_uc_exception(uc)
 
 
+@cache
 def get_win_chrome_version() -> int | None:
     """
-    Get Chrome version on Windows os.
+    Get Chrome version on Windows os. The version is only looked up once.
     """
+    if sys.platform != "win32":
+        return None  # The driver detects the version itself on other platforms.
+    import winreg  # Only available on Windows.
     try:
         key_path = r"SOFTWARE\Google\Chrome\BLBeacon"  # Path to the registry key where Chrome version is stored
         key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, key_path)  # Open the registry key
@@ -51,20 +65,32 @@ def get_win_chrome_version() -> int | None:
         logger.exception(f"An error occurred: {error}")
 
 
-class ScrapperTools:
-    headers = anime_list = resolved_names_file = tb = current_date = None
+class ScrapperTools(ABC):
+    headers = title_matcher = name_archive = tb = current_date = None  # A TitleMatcher and a NameArchive.
     video_num_per_post = None  # The number of recent videos that will downloaded per post.
+    max_post_workers, max_episode_workers = 3, 4  # The number of post and episode pages of a site resolved at a time.
+    keep_first_link = False  # Keep the first download link found when posts share a resolved name.
+    listing_depth = 3  # The number of listing pages checked for recent posts.
+    last_fetch = local()  # Whether the last page fetched by the thread changed since it was cached.
+    crawl_state: CrawlState | None = None  # Posts that can not have new episodes are skipped when set.
+    media_link_cache: MediaLinkCache | None = None  # Resolved media links are reused across runs when set.
+    media_link_ttl = 7 * 24 * 3600  # Seconds a resolved media link is reused for. Lower it for signed links.
     parser = "html.parser"
-    ch_gen = ChineseTitleGenerator()
+    fast_parser = "lxml" if find_spec("lxml") else "html.parser"  # Used for pages parsed with a parse only filter.
+    parse_only = {}  # Page type as key and a SoupStrainer matching the only elements read from the page as value.
+    title_cache: TitleCache | None = None  # Resolved names, shared with YouTube. Must be set before scrapping.
     latest_ep_tag = " LST-EP:"
     m3u8_pattern = re.compile(r"https?://[\w\-./:]+.m3u8")
+    episode_label_pattern = re.compile(r"^第?(\d+)[集话]?$")  # Episode labels like 第01集, 第1话, 01 and 1.
     # Common texts used by scrappers are shared from here.
     check_downlink_message = "..........Checking for latest videos download links.........."
     time_message = "Time taken to retrieve recent posts download links: "
-    # undetected_chromedriver selenium config
-    chrome_version = get_win_chrome_version()
-    sel_driver = uc.Chrome(version_main=chrome_version)
-    sel_driver.minimize_window()
+    # Browser page readiness. The loading text is part of the page's scripts, a second copy shows until it is loaded.
+    list_loaded_script = "return document.documentElement.outerHTML.split('正在加载列表中').length <= 2;"
+    # undetected_chromedriver selenium config. Chrome is only started when a scrapper first borrows a tab.
+    browser_pool = BrowserPool(version_getter=get_win_chrome_version)
+    page_fetcher = PageFetcher()  # Pages are fetched with HTTP unless the site needs the browser.
+    link_prober = LinkProber()  # Link checks are shared by the scrappers.
 
     def match_to_recent_videos(self, posts: dict) -> dict:
         """
@@ -72,30 +98,218 @@ class ScrapperTools:
         :param posts: Posts should have name as key and url as value.
         :return: Anime names as key and post titles and urls as values.
         """
-        matched_posts = {}
+        matched_posts, post_titles = {}, list(posts)
         logger.info("..........Matching names to site recent post..........")
-        for anime_name in self.anime_list:
-            for post_title, post_url in posts.items():
-                if anime_name in post_title:
-                    logger.info(f"Anime Name: {anime_name} matches Post Title: {post_title}, Post URL: {post_url}")
-                    matched_posts[post_title] = anime_name, post_url
+        for anime_name, title_index in self.title_matcher.match(post_titles):
+            post_title, post_url = post_titles[title_index], posts[post_titles[title_index]]
+            logger.info(f"Anime Name: {anime_name} matches Post Title: {post_title}, Post URL: {post_url}")
+            matched_posts[post_title] = anime_name, post_url
         if not matched_posts:
             logger.info("No post matches found!")
         return matched_posts
 
     def extract_video_links(self, url: str, wait_time: int = 5) -> list:
         """
-        Extract all the m3u8 video download links from the network log of the site url.
+        Extract the m3u8 video download links from the network requests of the site url.
+        Returns as soon as the page requests a m3u8 link or once wait_time seconds have passed.
+        """
+        with self.browser_pool.page(self.base_url) as page:
+            return page.capture_links(url, self.m3u8_pattern, wait_time)
+
+    def make_soup(self, page_text: str, page_type: str = None) -> BeautifulSoup:
+        """
+        Parse only the elements the scrapper reads from the type of page. Pages without a filter are parsed whole
+        with the default parser because their scrappers walk between elements and depend on its tree.
+        """
+        if strainer := self.parse_only.get(page_type):
+            return BeautifulSoup(page_text, self.fast_parser, parse_only=strainer)
+        return BeautifulSoup(page_text, self.parser)
+
+    def fetch_page_text(self, url: str, browser_fetch: Callable[[str], str], is_ready: Callable[[str], bool] = None,
+                        page_type: str = None) -> str:
+        page_text, self.last_fetch.changed = self.page_fetcher.fetch_page(url, browser_fetch, is_ready, page_type)
+        return page_text
+
+    def get_listing_page(self, page: int) -> tuple[dict, bool]:
+        """
+        :return: The posts of the listing page and whether the page changed since the last crawl.
+        """
+        self.last_fetch.changed = True  # Pages not fetched through the page fetcher always count as changed.
+        posts = self.get_anime_posts(page)
+        return posts, self.last_fetch.changed
+
+    def get_recent_anime_posts(self) -> dict:
+        """
+        Get the posts of the listing pages up to the listing depth. The first page is fetched on its own and the
+        other pages are fetched at the same time after it. They are skipped when the first page has not changed
+        since the last crawl and the crawl state shows every post of the site is settled, their posts were already
+        checked and their episodes downloaded. Without the crawl state the other pages are always fetched.
+        """
+        all_posts, changed = self.get_listing_page(1)
+        if not changed and self.crawl_state and not self.crawl_state.has_unsettled(self.base_url):
+            if self.listing_depth > 1:
+                logger.info(f"Listing page 1 has not changed since the last crawl and all posts are settled. "
+                            f"Skipping pages 2-{self.listing_depth}!")
+            return all_posts
+        with ThreadPoolExecutor(max(self.listing_depth - 1, 1)) as executor:
+            for posts, _ in executor.map(self.get_listing_page, range(2, self.listing_depth + 1)):
+                all_posts.update(posts)
+        return all_posts
+
+    def index_episode_links(self, labelled_links: Iterable[tuple]) -> dict:
+        """
+        Index the episode links of a post page in one pass, so finding the link of an episode does not search the
+        page again. Labels that are not an episode label are ignored. When several links have the same episode,
+        labels like 第N集 are preferred over bare numbers, which other links such as the pager can also have. Ties
+        are broken by the link priority and then by the order of the links.
+        :param labelled_links: The label, href and optionally the priority of the links of the post page, with any
+            post title removed. Lower priorities are preferred.
+        :return: Episode number as key and episode page url as value.
+        """
+        ranked_links = {}  # Episode number as key and the rank and url of the best link as value.
+        for label, href, *priority in labelled_links:
+            if label and href and (match := self.episode_label_pattern.match(label.strip())):
+                episode, rank = int(match.group(1)), (match.group(1) == label.strip(), *priority)
+                if episode not in ranked_links or rank < ranked_links[episode][0]:
+                    ranked_links[episode] = rank, self.base_url + href
+        return {episode: video_link for episode, (_, video_link) in ranked_links.items()}
+
+    def get_new_episodes(self, post_title: str, anime_name: str, video_numbers: range,
+                         get_video_link: Callable[[int], str | None]) -> list:
+        """
+        Get the episodes of the post that are not in the archive.
+        :param get_video_link: Finds the episode page link of a video number in the post page.
+        :return: Resolved name, post video name and a function that finds the episode page link, in episode order.
+        """
+        new_episodes = []
+        for video_number in video_numbers:
+            post_video_name = f"{post_title} 第{video_number}集"
+            resolved_name = self.title_cache.generate_title(post_video_name, anime_name)
+            if resolved_name in self.name_archive:
+                logger.warning(f"Post Video Name: {post_video_name}, "
+                               f"Resolved Name: {resolved_name} already in archive!")
+                continue
+            new_episodes.append((resolved_name, post_video_name, lambda number=video_number: get_video_link(number)))
+        return new_episodes
+
+    @abstractmethod
+    def get_post_episodes(self, post_title: str, match_details: tuple) -> list:
+        """
+        Use the post page to get the recent episodes of the post that are not in the archive.
+        :return: The episodes as returned by get_new_episodes.
+        """
+
+    @abstractmethod
+    def get_video_download_link(self, video_url: str) -> str | None:
+        """
+        Use the episode page to get the video download link.
+        """
+
+    def get_listing_marker(self, post_title: str) -> str | None:
+        """
+        :return: The latest episode shown by the listing page. None if the post title does not have it.
+        """
+        if self.latest_ep_tag in post_title:
+            return post_title.split(self.latest_ep_tag)[1]
+
+    def check_post_episodes(self, post_title: str, match_details: tuple) -> list:
+        """
+        Get the post episodes unless the crawl state shows the post can not have new ones. A settled post is
+        skipped without loading its page while the listing shows the same latest episode. Posts of sites whose
+        listing does not show it are always loaded, the archive check keeps their episode pages from being loaded.
+        :return: The episodes as returned by get_new_episodes.
+        """
+        if not self.crawl_state:
+            return self.get_post_episodes(post_title, match_details)
+        post_url, marker = match_details[1], self.get_listing_marker(post_title)
+        post_state = self.crawl_state.get(self.base_url, post_url) or {}
+        if post_state.get("settled") and marker and post_state["marker"] == marker:
+            logger.info(f"Post Title: {post_title} latest episode has not changed since the last crawl, skipping!")
+            self.crawl_state.update(self.base_url, post_url, marker, True)
+            return []
+        try:
+            episodes = self.get_post_episodes(post_title, match_details)
+        except Exception:
+            self.crawl_state.update(self.base_url, post_url, marker, False)  # Checked again on the next run.
+            raise
+        self.crawl_state.update(self.base_url, post_url, marker, not episodes)
+        return episodes
+
+    def get_cached_download_link(self, video_url: str | None) -> str | None:
+        """
+        Reuse the media link resolved from the episode page on an earlier run if it still works, otherwise load the
+        episode page and cache the link. Links that no longer work are removed from the cache.
+        """
+        if not video_url or not self.media_link_cache:
+            return self.get_video_download_link(video_url)
+        if download_link := self.media_link_cache.get(video_url):
+            # A failed check is not remembered, the episode page can resolve the same link and test it again.
+            if self.link_prober.probe(download_link, self.headers, remember_dead=False):
+                logger.debug(f"Cached download link used for {video_url}")
+                return download_link
+            logger.info(f"Cached download link: {download_link} no longer works, removing it.")
+            self.media_link_cache.remove(video_url)
+        download_link = self.get_video_download_link(video_url)
+        if download_link:
+            self.media_link_cache.set(video_url, download_link, self.media_link_ttl)
+        return download_link
+
+    def resolve_episode(self, get_video_link: Callable[[], str | None]) -> tuple[str | None, str | None]:
+        video_link = get_video_link()
+        return video_link, self.get_cached_download_link(video_link)
+
+    def get_recent_posts_videos_download_link(self, matched_posts: dict) -> dict:
+        """
+        Check if post's url latest video is recent and gets the videos download links of it and its other recent posts.
+        How many of the other recent post videos are determined by video_num_per_post value.
+        Post pages and episode pages are resolved concurrently. The results keep the order of the posts and episodes
+        and a failed post or episode is reported without stopping the others.
+        """
+        logger.info(self.check_downlink_message)
+        all_download_details, failures, start = {}, [], time.perf_counter()
+        post_episodes = {}  # Post title as key and the episodes with their future as value.
+        with (ThreadPoolExecutor(self.max_post_workers) as post_executor,
+              ThreadPoolExecutor(self.max_episode_workers) as episode_executor):
+            post_futures = {post_executor.submit(self.check_post_episodes, post_title, match_details): post_title
+                            for post_title, match_details in matched_posts.items()}
+            for post_future in as_completed(post_futures):  # Episodes are queued as soon as their post is resolved.
+                post_title = post_futures[post_future]
+                try:
+                    post_episodes[post_title] = [
+                        (resolved_name, post_video_name, episode_executor.submit(self.resolve_episode, get_video_link))
+                        for resolved_name, post_video_name, get_video_link in post_future.result()]
+                except Exception as error:
+                    logger.exception(f"Post Title: {post_title} failed! Error: {error}")
+                    failures.append(f"Post Title: {post_title}, Error: {error}")
+            for post_title in matched_posts:
+                for resolved_name, post_video_name, episode_future in post_episodes.get(post_title, []):
+                    try:
+                        video_link, download_link = episode_future.result()
+                    except Exception as error:
+                        logger.exception(f"Post Video Name: {post_video_name} failed! Error: {error}")
+                        failures.append(f"Post Video Name: {post_video_name}, Error: {error}")
+                        continue
+                    logger.info(f"Post Video Name: {post_video_name}, Video Link: {video_link}, "
+                                f"Download Link: {download_link}")
+                    if self.keep_first_link and resolved_name in all_download_details \
+                            and all_download_details[resolved_name][1]:
+                        continue
+                    all_download_details[resolved_name] = post_video_name, download_link
+        if failures:
+            self.tb.send_telegram_message(f"Site: {self.base_url} pages failed to resolve!\n" + "\n".join(failures))
+        logger.info(f"{self.time_message}{round(time.perf_counter() - start)}s")
+        return all_download_details
+
+    def browser_page_source(self, url: str, ready_script: str = None, failed_script: str = None) -> str:
+        with self.browser_pool.page(self.base_url) as page:
+            return page.load(url, ready_script, failed_script)
+
+    @staticmethod
+    def list_loaded(page_text: str) -> bool:
+        """
+        Same check as the list loaded script for pages fetched with HTTP.
         """
-        capabilities = DesiredCapabilities.CHROME
-        capabilities["goog:loggingPrefs"] = {"performance": "ALL"}
-        driver = uc.Chrome(desired_capabilities=capabilities, headless=True)
-        driver.get(url)
-        time.sleep(wait_time)
-        logs = driver.get_log("performance")
-        links = self.m3u8_pattern.findall(str(logs))
-        driver.quit()
-        return links
+        return page_text.count("正在加载列表中") <= 1
 
     def get_num_of_videos(self, latest_video_number: int) -> int:
         if latest_video_number < self.video_num_per_post:  # Prevents asking for more videos than are available.
@@ -108,27 +322,27 @@ class ScrapperTools:
         post_num = [char for char in video_post if char.isdigit()]
         return int(''.join(post_num)) if post_num else 0
 
-    def test_links(self, session, links: list) -> str | None:
+    def test_links(self, links: list) -> str | None:
         """
-        Use the classes request session to test for a working link.
-        @return: Working link
+        Test the links at the same time without downloading them.
+        @return: The first working link in the order given.
         """
         logger.debug(f"Testing links: {links}")
-        for link in links:
-            try:
-                page_response = session.get(link, headers=self.headers)
-                page_response.raise_for_status()
-                return link
-            except requests.RequestException:
-                logger.debug(f"Link: {link} failed test.")
+        return self.link_prober.first_alive(links, self.headers)
 
 
 class XiaobaotvScraper(ScrapperTools):
+    parse_only = {
+        "listing": SoupStrainer('li', class_='col-lg-8 col-md-6 col-sm-4 col-xs-3'),
+        "post": SoupStrainer(['span', 'li']),
+        "episode": SoupStrainer(class_='embed-responsive clearfix'),
+    }
+
     def __init__(self, site: str) -> None:
         self.base_url = f"https://{site}"
         self.r_proxy, self.proxy_driver = RotatingProxiesRequest(), None
+        self.proxy_lock = Lock()  # The proxy driver can only load one page at a time.
         # self.detect_site_block()
-        self.resolved_names_archive = set(self.resolved_names_file.read_text(encoding="utf-8").splitlines())
 
     def set_proxy_request(self, url: str) -> None:
         if proxy := self.r_proxy.get_proxy(url):
@@ -137,15 +351,17 @@ class XiaobaotvScraper(ScrapperTools):
             self.proxy_driver = uc.Chrome(options)
 
     def detect_site_block(self) -> None:
-        page_response = requests.get(self.base_url, headers=self.headers)
+        page_response = HTTPClient.get_session().get(self.base_url, headers=self.headers)
         if page_response.status_code == 403:
             logger.info("Real Ip address has been blocked. Switching to rotating proxy requests.")
             self.set_proxy_request(self.base_url)
 
-    def get_page_response(self, url: str) -> BeautifulSoup:
-        driver = self.proxy_driver or self.sel_driver
-        driver.get(url)
-        return BeautifulSoup(driver.page_source, self.parser)
+    def get_page_response(self, url: str, page_type: str = None) -> BeautifulSoup:
+        if self.proxy_driver:
+            with self.proxy_lock:
+                self.proxy_driver.get(url)
+                return BeautifulSoup(self.proxy_driver.page_source, self.parser)
+        return self.make_soup(self.fetch_page_text(url, self.browser_page_source, page_type=page_type), page_type)
 
     def get_anime_posts(self, page: int = 1) -> dict:
         """
@@ -155,7 +371,7 @@ class XiaobaotvScraper(ScrapperTools):
         logger.info(f"..........Site Page {page} Anime Posts..........")
         video_name_and_link = {}
         payload = f"/index.php/vod/show/id/51/page/{page}.html"
-        soup = self.get_page_response(self.base_url + payload)
+        soup = self.get_page_response(self.base_url + payload, "listing")
         posts = soup.find_all('li', class_='col-lg-8 col-md-6 col-sm-4 col-xs-3')
         for post in posts:
             post_title = post.find('h4', class_='title text-overflow').text
@@ -164,57 +380,38 @@ class XiaobaotvScraper(ScrapperTools):
             video_name_and_link[post_title] = post_url
         return video_name_and_link
 
-    def get_post_video_link(self, soup: BeautifulSoup, post_title: str, video_number: int) -> str | None:
-        video_post1 = soup.find('li', {"title": f"第{video_number:02d}集"})
-        if video_post1:
-            return self.base_url + video_post1.find('a').get('href')
-        video_post2 = soup.find('li', {"title": f"第{video_number}集"})
-        if video_post2:
-            return self.base_url + video_post2.find('a').get('href')
-        video_post3 = soup.find('li', {"title": f"{video_number}"})
-        if video_post3:
-            return self.base_url + video_post3.find('a').get('href')
+    def get_post_video_link(self, episode_links: dict, post_title: str, video_number: int) -> str | None:
+        if video_link := episode_links.get(video_number):
+            return video_link
         logger.error(f"Video Link not found for Video Number:{post_title} {video_number}!")
 
+    def get_post_episodes(self, post_title: str, match_details: tuple) -> list:
+        anime_name, url = match_details[0], match_details[1]
+        soup = self.get_page_response(url, "post")
+        post_update = soup.find('span', class_='text-red')
+        if not post_update:
+            logger.warning(f"Post Title: {post_title}, post update not available!")
+            return []
+        post_update = post_update.text.split(' / ')
+        last_updated_date = parser.parse(post_update[1]).date()
+        if not last_updated_date >= self.current_date:
+            logger.warning(f"Post Title: {post_title} is not recent, Last Updated: {last_updated_date}")
+            return []
+        latest_video_number = self.video_post_num_extractor(post_update[0])
+        num_videos = self.get_num_of_videos(latest_video_number)
+        video_start_num = latest_video_number - num_videos + 1
+        logger.info(f"Post Title: {post_title} is new, Last Updated: {last_updated_date}, "
+                    f"Latest Video Number: {latest_video_number}. "
+                    f"Last {num_videos} Video Numbers: {video_start_num}-{latest_video_number}")
+        episode_links = self.index_episode_links(
+            (video_post['title'], link.get('href')) for video_post in soup.find_all('li', title=True)
+            if (link := video_post.find('a')))
+        return self.get_new_episodes(
+            post_title, anime_name, range(video_start_num, latest_video_number + 1),
+            lambda video_number: self.get_post_video_link(episode_links, post_title, video_number))
+
     def get_recent_posts_videos_download_link(self, matched_posts: dict) -> dict:
-        """
-        Check if post's url latest video is recent and gets the videos download links of it and its other recent posts.
-        How many of the other recent post videos are determined by video_num_per_post value.
-        """
-        logger.info(self.check_downlink_message)
-        all_download_details, start = {}, time.perf_counter()
-        for post_title, match_details in matched_posts.items():
-            anime_name, url = match_details[0], match_details[1]
-            soup = self.get_page_response(url)
-            post_update = soup.find('span', class_='text-red')
-            if not post_update:
-                logger.warning(f"Post Title: {post_title}, post update not available!")
-                continue
-            post_update = post_update.text.split(' / ')
-            last_updated_date = parser.parse(post_update[1]).date()
-            if not last_updated_date >= self.current_date:
-                logger.warning(f"Post Title: {post_title} is not recent, Last Updated: {last_updated_date}")
-                continue
-            latest_video_number = self.video_post_num_extractor(post_update[0])
-            num_videos = self.get_num_of_videos(latest_video_number)
-            video_start_num = latest_video_number - num_videos + 1
-            logger.info(f"Post Title: {post_title} is new, Last Updated: {last_updated_date}, "
-                        f"Latest Video Number: {latest_video_number}. "
-                        f"Last {num_videos} Video Numbers: {video_start_num}-{latest_video_number}")
-            for video_number in range(video_start_num, latest_video_number + 1):
-                post_video_name = f"{post_title} 第{video_number}集"
-                resolved_name = self.ch_gen.generate_title(post_video_name, anime_name)
-                if resolved_name in self.resolved_names_archive:
-                    logger.warning(f"Post Video Name: {post_video_name}, "
-                                   f"Resolved Name: {resolved_name} already in archive!")
-                    continue
-                video_link = self.get_post_video_link(soup, post_title, video_number)
-                download_link = self.get_video_download_link(video_link)
-                logger.info(f"Post Video Name: {post_video_name}, Video Link: {video_link}, "
-                            f"Download Link: {download_link}")
-                all_download_details[resolved_name] = post_video_name, download_link
-        end = time.perf_counter()
-        logger.info(f"{self.time_message}{round(end - start)}s")
+        all_download_details = super().get_recent_posts_videos_download_link(matched_posts)
         if self.proxy_driver:
             self.proxy_driver.close()
         return all_download_details
@@ -224,7 +421,7 @@ class XiaobaotvScraper(ScrapperTools):
         This method uses the video url to find the video download link.
         """
         if video_url:
-            soup = self.get_page_response(video_url)
+            soup = self.get_page_response(video_url, "episode")
             download_script = soup.find(class_='embed-responsive clearfix')
             download_match = re.search(r'"url":"(.*?)"', str(download_script))
             if download_match:
@@ -233,29 +430,15 @@ class XiaobaotvScraper(ScrapperTools):
 
 
 class AnimeBabyScrapper(ScrapperTools):
+    keep_first_link = True
+    # Post pages are parsed whole, the latest video is found through the element next to the label.
+    parse_only = {"listing": SoupStrainer('a', class_="module-item-title"), "episode": SoupStrainer(id="bfurl")}
+
     def __init__(self, site: str) -> None:
         self.base_url = f"https://{site}"
-        self.session = requests.Session()
-        self.cloudflare_detected = self.detect_cloudflare()
-        self.resolved_names_archive = set(self.resolved_names_file.read_text(encoding="utf-8").splitlines())
-
-    def detect_cloudflare(self) -> bool:
-        page_response = self.session.get(self.base_url, headers=self.headers)
-        if "cloudflare" in page_response.text:
-            logger.warning("Cloudflare detected in site!")
-            return True
-        else:
-            logger.info("Cloudflare not detected in site.")
-            return False
 
-    def get_page_response(self, url: str) -> BeautifulSoup:
-        if not self.cloudflare_detected:
-            page_response = self.session.get(url, headers=self.headers)
-            page_response.raise_for_status()
-            return BeautifulSoup(page_response.text, self.parser)
-        else:
-            self.sel_driver.get(url)
-            return BeautifulSoup(self.sel_driver.page_source, self.parser)
+    def get_page_response(self, url: str, page_type: str = None) -> BeautifulSoup:
+        return self.make_soup(self.fetch_page_text(url, self.browser_page_source, page_type=page_type), page_type)
 
     def get_anime_posts(self, page: int = 1) -> dict:
         """
@@ -265,7 +448,7 @@ class AnimeBabyScrapper(ScrapperTools):
         logger.info(f"..........Site Page {page} Anime Posts..........")
         video_name_and_link = {}
         payload = f"/index.php/vod/show/id/20/page/{page}.html"
-        soup = self.get_page_response(self.base_url + payload)
+        soup = self.get_page_response(self.base_url + payload, "listing")
         posts = soup.find_all('a', class_="module-item-title")
         for post in posts:
             post_title = post.contents[0]
@@ -274,88 +457,60 @@ class AnimeBabyScrapper(ScrapperTools):
             video_name_and_link[post_title] = post_url
         return video_name_and_link
 
-    def get_post_video_link(self, soup: BeautifulSoup, post_title: str, post_url: str, video_number: int) -> str | None:
-        video_post4 = soup.find('a', {"title": f"播放{post_title}第{video_number:02d}话"})
-        if video_post4:
-            return self.base_url + video_post4.get('href')
-        video_post1 = soup.find('a', {"title": f"播放{post_title}第{video_number:02d}集"})
-        if video_post1:
-            return self.base_url + video_post1.get('href')
-        video_post2 = soup.find('a', {"title": f"播放{post_title}第{video_number}集"})
-        if video_post2:
-            return self.base_url + video_post2.get('href')
-        video_post3 = soup.find('a', {"title": f"播放{post_title}{video_number}"})
-        if video_post3:
-            return self.base_url + video_post3.get('href')
+    def get_post_video_link(self, episode_links: dict, post_title: str, post_url: str,
+                            video_number: int) -> str | None:
+        if video_link := episode_links.get(video_number):
+            return video_link
         video_link = f"{post_url.replace("detail", "play").rstrip(".html")}/sid/1/nid/{video_number}.html"
-        video_link = self.test_links(self.session, [video_link])
+        video_link = self.test_links([video_link])
         if video_link:
             return video_link
         logger.error(f"Video Link not found for Video Number:{post_title} {video_number}!")
 
-    def get_recent_posts_videos_download_link(self, matched_posts: dict) -> dict:
-        """
-        Check if post's url latest video is recent and gets the videos download links of it and its other recent posts.
-        How many of the other recent post videos are determined by video_num_per_post value.
-        """
-        logger.info(self.check_downlink_message)
-        all_download_details, start = {}, time.perf_counter()
-        for post_title, match_details in matched_posts.items():
-            anime_name, post_url = match_details[0], match_details[1]
-            soup = self.get_page_response(post_url)
-            latest_video_post = soup.find(string="连载：").parent.next_sibling.text
-            latest_video_number = self.video_post_num_extractor(latest_video_post)
-            if not latest_video_number:
-                logger.info(f"Post Title: {post_title} has finished airing! URL: {post_url}")
-                continue
-            num_videos = self.get_num_of_videos(latest_video_number)
-            video_start_num = latest_video_number - num_videos + 1
-            logger.info(f"Post Title: {post_title}, Latest Video Number: {latest_video_number}. "
-                        f"Last {num_videos} Video Numbers: {video_start_num}-{latest_video_number}")
-            for video_number in range(video_start_num, latest_video_number + 1):
-                post_video_name = f"{post_title} 第{video_number}集"
-                resolved_name = self.ch_gen.generate_title(post_video_name, anime_name)
-                if resolved_name in self.resolved_names_archive:
-                    logger.warning(f"Post Video Name: {post_video_name}, "
-                                   f"Resolved Name: {resolved_name} already in archive!")
-                    continue
-                video_link = self.get_post_video_link(soup, post_title, post_url, video_number)
-                download_link = self.get_video_download_link(video_link)
-                logger.info(f"Post Video Name: {post_video_name}, Video Link: {video_link}, "
-                            f"Download Link: {download_link}")
-                if resolved_name in all_download_details and all_download_details[resolved_name][1]:
-                    continue
-                all_download_details[resolved_name] = post_video_name, download_link
-        end = time.perf_counter()
-        logger.info(f"{self.time_message}{round(end - start)}s")
-        return all_download_details
+    def get_post_episodes(self, post_title: str, match_details: tuple) -> list:
+        anime_name, post_url = match_details[0], match_details[1]
+        soup = self.get_page_response(post_url, "post")
+        latest_video_post = soup.find(string="连载：").parent.next_sibling.text
+        latest_video_number = self.video_post_num_extractor(latest_video_post)
+        if not latest_video_number:
+            logger.info(f"Post Title: {post_title} has finished airing! URL: {post_url}")
+            return []
+        num_videos = self.get_num_of_videos(latest_video_number)
+        video_start_num = latest_video_number - num_videos + 1
+        logger.info(f"Post Title: {post_title}, Latest Video Number: {latest_video_number}. "
+                    f"Last {num_videos} Video Numbers: {video_start_num}-{latest_video_number}")
+        title_prefix = f"播放{post_title}"  # Link titles hold the post title, which can end with a number.
+        episode_links = self.index_episode_links(
+            (link['title'].removeprefix(title_prefix), link.get('href')) for link in soup.find_all('a', title=True)
+            if link['title'].startswith(title_prefix))
+        return self.get_new_episodes(
+            post_title, anime_name, range(video_start_num, latest_video_number + 1),
+            lambda video_number: self.get_post_video_link(episode_links, post_title, post_url, video_number))
 
     def get_video_download_link(self, video_url: str) -> str | None:
         """
         This method uses the video url to find the video download link.
         """
         if video_url:
-            soup = self.get_page_response(video_url)
+            soup = self.get_page_response(video_url, "episode")
             download_link = soup.find(id="bfurl").get('href')
             return download_link
 
 
 class AgeDm1Scrapper(ScrapperTools):
+    parse_only = {
+        "listing": SoupStrainer(class_=['anime_icon2', 'li-hv']),  # The site serves two listing page structures.
+        "post": SoupStrainer('a'),
+        "episode": SoupStrainer(id="playiframe"),
+    }
+
     def __init__(self, site: str) -> None:
         self.base_url = f"https://{site}"
-        self.session = requests.Session()
-        self.resolved_names_archive = set(self.resolved_names_file.read_text(encoding="utf-8").splitlines())
-
-    def get_page_response(self, url: str, sleep_time: int = 0) -> BeautifulSoup:
-        self.sel_driver.get(url)
-        attempts = 0
-        time.sleep(sleep_time)
-        while self.sel_driver.page_source.count("正在加载列表中") > 1 and attempts < 4:
-            attempts += 1
-            logger.info(f"Page not fully loaded, refreshing... attempt:{attempts}")
-            self.sel_driver.refresh()
-            time.sleep(sleep_time * 3)
-        return BeautifulSoup(self.sel_driver.page_source, self.parser)
+
+    def get_page_response(self, url: str, page_type: str = None) -> BeautifulSoup:
+        page_text = self.fetch_page_text(url, lambda link: self.browser_page_source(link, self.list_loaded_script),
+                                         self.list_loaded, page_type)
+        return self.make_soup(page_text, page_type)
 
     def get_anime_posts(self, page: int = 1) -> dict:
         """
@@ -365,7 +520,7 @@ class AgeDm1Scrapper(ScrapperTools):
         logger.info(f"..........Site Page {page} Anime Posts..........")
         video_name_and_link = {}
         payload = f"/acg/china/{page}.html"
-        soup = self.get_page_response(self.base_url + payload, 2)
+        soup = self.get_page_response(self.base_url + payload, "listing")
         posts = soup.find_all('li', class_='anime_icon2')
         # Sometimes a page with a different html structure is loaded.
         if posts:
@@ -385,89 +540,60 @@ class AgeDm1Scrapper(ScrapperTools):
                 video_name_and_link[f"{post_title}{self.latest_ep_tag}{latest_video_number}"] = post_url
         return video_name_and_link
 
-    def get_post_video_link(self, soup: BeautifulSoup, video_number: int, url: str) -> str | None:
-        video_post1 = soup.find('a', string=f"第{video_number}集")
-        if video_post1:
-            return self.base_url + video_post1.get('href')
-        video_post2 = soup.find('a', class_="twidth", string=str(video_number))
-        if video_post2:
-            return self.base_url + video_post2.get('href')
-        video_post3 = soup.find('a', string=str(video_number))
-        if video_post3:
-            return self.base_url + video_post3.get('href')
+    def get_post_video_link(self, episode_links: dict, video_number: int, url: str) -> str | None:
+        if video_link := episode_links.get(video_number):
+            return video_link
         video_link = f"{url}{video_number}.html"
-        try:
-            page_response = self.session.get(video_link, headers=self.headers)
-            page_response.raise_for_status()
+        if self.test_links([video_link]):
             return video_link
-        except requests.RequestException:
-            logger.error(f"Video Link: {video_link} failed test.")
+        logger.error(f"Video Link: {video_link} failed test.")
         logger.error(f"Video Link not found for Video Number: {video_number}!")
 
-    def get_recent_posts_videos_download_link(self, matched_posts: dict) -> dict:
-        """
-        Check if post's url latest video is recent and gets the videos download links of it and its other recent posts.
-        How many of the other recent post videos are determined by video_num_per_post value.
-        """
-        logger.info(self.check_downlink_message)
-        all_download_details, start = {}, time.perf_counter()
-        for post_title_and_last_ep, match_details in matched_posts.items():
-            post_split = post_title_and_last_ep.split(self.latest_ep_tag)
-            post_title, latest_video_number = post_split[0], self.video_post_num_extractor(post_split[1])
-            anime_name, url = match_details[0], match_details[1]
-            soup = self.get_page_response(url)
-            num_videos = self.get_num_of_videos(latest_video_number)
-            video_start_num = latest_video_number - num_videos + 1
-            logger.info(f"Post Title: {post_title}, Latest Video Number: {latest_video_number}. "
-                        f"Last {num_videos} Video Numbers: {video_start_num}-{latest_video_number}")
-            for video_number in range(video_start_num, latest_video_number + 1):
-                post_video_name = f"{post_title} 第{video_number}集"
-                resolved_name = self.ch_gen.generate_title(post_video_name, anime_name)
-                if resolved_name in self.resolved_names_archive:
-                    logger.warning(f"Post Video Name: {post_video_name}, "
-                                   f"Resolved Name: {resolved_name} already in archive!")
-                    continue
-                video_link = self.get_post_video_link(soup, video_number, url)
-                download_link = self.get_video_download_link(video_link)
-                logger.info(f"Post Video Name: {post_video_name}, Video Link: {video_link}, "
-                            f"Download Link: {download_link}")
-                all_download_details[resolved_name] = post_video_name, download_link
-        end = time.perf_counter()
-        logger.info(f"{self.time_message}{round(end - start)}s")
-        return all_download_details
+    def get_post_episodes(self, post_title_and_last_ep: str, match_details: tuple) -> list:
+        post_split = post_title_and_last_ep.split(self.latest_ep_tag)
+        post_title, latest_video_number = post_split[0], self.video_post_num_extractor(post_split[1])
+        anime_name, url = match_details[0], match_details[1]
+        soup = self.get_page_response(url, "post")
+        num_videos = self.get_num_of_videos(latest_video_number)
+        video_start_num = latest_video_number - num_videos + 1
+        logger.info(f"Post Title: {post_title}, Latest Video Number: {latest_video_number}. "
+                    f"Last {num_videos} Video Numbers: {video_start_num}-{latest_video_number}")
+        episode_links = self.index_episode_links(  # Bare numbers of the episode list have the twidth class.
+            (link.string, link.get('href'), 'twidth' not in link.get('class', [])) for link in soup.find_all('a'))
+        return self.get_new_episodes(post_title, anime_name, range(video_start_num, latest_video_number + 1),
+                                     lambda video_number: self.get_post_video_link(episode_links, video_number, url))
 
     def get_video_download_link(self, video_url: str) -> str | None:
         """
         This method uses the video url to find the video download link.
         """
         if video_url:
-            soup = self.get_page_response(video_url)
+            soup = self.get_page_response(video_url, "episode")
             download_match = soup.find(id="playiframe")
             if download_match:
                 download_links = self.m3u8_pattern.findall(download_match.get('src'))
                 download_links = [link.replace("497", "") for link in download_links]
-                download_link = self.test_links(self.session, download_links)
+                download_link = self.test_links(download_links)
                 if download_link:
                     return download_link
 
 
 class YhdmScrapper(ScrapperTools):
+    parse_only = {
+        "listing": SoupStrainer('a', class_="li-hv"),
+        "post": SoupStrainer('a'),
+        "episode": SoupStrainer(id="playiframe"),
+    }
+    failed_script = "return document.documentElement.outerHTML.includes('not private');"  # Only a refresh helps.
+
     def __init__(self, site: str) -> None:
         self.base_url = f"http://{site}"
-        self.session = requests.Session()
-        self.resolved_names_archive = set(self.resolved_names_file.read_text(encoding="utf-8").splitlines())
-
-    def get_page_response(self, url: str, sleep_time: int = 0) -> BeautifulSoup:
-        self.sel_driver.get(url)
-        attempts = 0
-        time.sleep(sleep_time)
-        while (("not private" in self.sel_driver.page_source or self.sel_driver.page_source.count("正在加载列表中") > 1)
-               and attempts < 4):
-            attempts += 1
-            logger.info(f"Page not fully loaded, refreshing... attempt:{attempts}")
-            self.sel_driver.refresh()
-            time.sleep(sleep_time * 3)
-        return BeautifulSoup(self.sel_driver.page_source, self.parser)
+
+    def get_page_response(self, url: str, page_type: str = None) -> BeautifulSoup:
+        page_text = self.fetch_page_text(
+            url, lambda link: self.browser_page_source(link, self.list_loaded_script, self.failed_script),
+            self.list_loaded, page_type)
+        return self.make_soup(page_text, page_type)
 
     def get_anime_posts(self, page: int = 1) -> dict:
         """
@@ -477,7 +603,7 @@ class YhdmScrapper(ScrapperTools):
         logger.info(f"..........Site Page {page} Anime Posts..........")
         video_name_and_link = {}
         payload = f"/acg/0/0/china/{page}.html"
-        soup = self.get_page_response(self.base_url + payload, 2)
+        soup = self.get_page_response(self.base_url + payload, "listing")
         posts = soup.find_all('a', class_="li-hv")
         for post in posts:
             post_title = post["title"]
@@ -488,79 +614,58 @@ class YhdmScrapper(ScrapperTools):
             video_name_and_link[f"{post_title}{self.latest_ep_tag}{latest_video_number}"] = post_url
         return video_name_and_link
 
-    def get_post_video_link(self, soup: BeautifulSoup, video_number: int) -> str | None:
-        video_post1 = soup.find('a', string=f"第{video_number}集")
-        if video_post1:
-            return self.base_url + video_post1.get('href')
-        video_post2 = soup.find('a', class_="twidth", string=str(video_number))
-        if video_post2:
-            return self.base_url + video_post2.get('href')
-        video_post3 = soup.find('a', string=str(video_number))
-        if video_post3:
-            return self.base_url + video_post3.get('href')
+    def get_post_video_link(self, episode_links: dict, video_number: int) -> str | None:
+        if video_link := episode_links.get(video_number):
+            return video_link
         logger.error(f"Video Link not found for Video Number: {video_number}!")
 
-    def get_recent_posts_videos_download_link(self, matched_posts: dict) -> dict:
-        """
-        Check if post's url latest video is recent and gets the videos download links of it and its other recent posts.
-        How many of the other recent post videos are determined by video_num_per_post value.
-        """
-        logger.info(self.check_downlink_message)
-        all_download_details, start = {}, time.perf_counter()
-        for post_title_and_last_ep, match_details in matched_posts.items():
-            post_split = post_title_and_last_ep.split(self.latest_ep_tag)
-            post_title, latest_video_number = post_split[0], int(post_split[1])
-            anime_name, url = match_details[0], match_details[1]
-            soup = self.get_page_response(url)
-            num_videos = self.get_num_of_videos(latest_video_number)
-            video_start_num = latest_video_number - num_videos + 1
-            logger.info(f"Post Title: {post_title}, Latest Video Number: {latest_video_number}. "
-                        f"Last {num_videos} Video Numbers: {video_start_num}-{latest_video_number}")
-            for video_number in range(video_start_num, latest_video_number + 1):
-                post_video_name = f"{post_title} 第{video_number}集"
-                resolved_name = self.ch_gen.generate_title(post_video_name, anime_name)
-                if resolved_name in self.resolved_names_archive:
-                    logger.warning(f"Post Video Name: {post_video_name}, "
-                                   f"Resolved Name: {resolved_name} already in archive!")
-                    continue
-                video_link = self.get_post_video_link(soup, video_number)
-                download_link = self.get_video_download_link(video_link)
-                logger.info(f"Post Video Name: {post_video_name}, Video Link: {video_link}, "
-                            f"Download Link: {download_link}")
-                all_download_details[resolved_name] = post_video_name, download_link
-        end = time.perf_counter()
-        logger.info(f"{self.time_message}{round(end - start)}s")
-        return all_download_details
+    def get_post_episodes(self, post_title_and_last_ep: str, match_details: tuple) -> list:
+        post_split = post_title_and_last_ep.split(self.latest_ep_tag)
+        post_title, latest_video_number = post_split[0], int(post_split[1])
+        anime_name, url = match_details[0], match_details[1]
+        soup = self.get_page_response(url, "post")
+        num_videos = self.get_num_of_videos(latest_video_number)
+        video_start_num = latest_video_number - num_videos + 1
+        logger.info(f"Post Title: {post_title}, Latest Video Number: {latest_video_number}. "
+                    f"Last {num_videos} Video Numbers: {video_start_num}-{latest_video_number}")
+        episode_links = self.index_episode_links(  # Bare numbers of the episode list have the twidth class.
+            (link.string, link.get('href'), 'twidth' not in link.get('class', [])) for link in soup.find_all('a'))
+        return self.get_new_episodes(post_title, anime_name, range(video_start_num, latest_video_number + 1),
+                                     lambda video_number: self.get_post_video_link(episode_links, video_number))
 
     def get_video_download_link(self, video_url: str) -> str | None:
         """
         This method uses the video url to find the video download link.
         """
         if video_url:
-            soup = self.get_page_response(video_url)
+            soup = self.get_page_response(video_url, "episode")
             download_match = soup.find(id="playiframe")
             if download_match:
                 download_links = self.m3u8_pattern.findall(download_match.get('src'))
                 download_links = [link.replace("497", "") for link in download_links]
-                download_link = self.test_links(self.session, download_links)
+                download_link = self.test_links(download_links)
                 if download_link:
                     return download_link
 
 
 class LQ010Scrapper(ScrapperTools):
+    # Post pages are parsed whole, the latest video is found through the element next to the label.
+    parse_only = {"listing": SoupStrainer('h4', class_='title text-overflow'),
+                  "episode": SoupStrainer("div", class_="myui-player__video")}
+
     def __init__(self, site: str) -> None:
         self.base_url = f"http://{site}"
-        self.session = requests.Session()
-        self.resolved_names_archive = set(self.resolved_names_file.read_text(encoding="utf-8").splitlines())
+        self.session = HTTPClient.get_session()
 
-    def get_page_response(self, url: str, request_type: int = 1) -> BeautifulSoup | None:
+    def get_page_response(self, url: str, request_type: int = 1, page_type: str = None) -> BeautifulSoup | None:
         if request_type == 1:
             page_response = self.session.get(url, headers=self.headers)
             page_response.raise_for_status()
-            return BeautifulSoup(page_response.text, self.parser)
+            return self.make_soup(page_response.text, page_type)
         if request_type == 2:
-            self.sel_driver.get(url)
-            return BeautifulSoup(self.sel_driver.page_source, self.parser)
+            with self.browser_pool.page(self.base_url) as page:
+                page.get(url)
+                return self.make_soup(page.page_source, page_type)
 
     def get_anime_posts(self, page: int = 1) -> dict:
         """
@@ -570,7 +675,7 @@ class LQ010Scrapper(ScrapperTools):
         logger.info(f"..........Site Page {page} Anime Posts..........")
         video_name_and_link = {}
         payload = f"/vodtype/dongman-{page}.html"
-        soup = self.get_page_response(self.base_url + payload)
+        soup = self.get_page_response(self.base_url + payload, page_type="listing")
         posts = soup.find_all('h4', class_='title text-overflow')
         for post in posts:
             post_title = post.find('a').get('title')
@@ -579,59 +684,32 @@ class LQ010Scrapper(ScrapperTools):
             video_name_and_link[post_title] = post_url
         return video_name_and_link
 
-    def get_post_video_link(self, soup: BeautifulSoup, post_title: str, video_number: int) -> str | None:
-        video_post1 = soup.find('a', class_="btn btn-default", string=f"{video_number}")
-        if video_post1:
-            return self.base_url + video_post1.get('href')
-        video_post2 = soup.find('a', class_="btn btn-default", string=f"第{video_number}集")
-        if video_post2:
-            return self.base_url + video_post2.get('href')
-        video_post3 = soup.find('a', class_="btn btn-default", string=f"{video_number:02d}")
-        if video_post3:
-            return self.base_url + video_post3.get('href')
-        video_post4 = soup.find('a', class_="btn btn-default", string=f"第{video_number:02d}集")
-        if video_post4:
-            return self.base_url + video_post4.get('href')
+    def get_post_video_link(self, episode_links: dict, post_title: str, video_number: int) -> str | None:
+        if video_link := episode_links.get(video_number):
+            return video_link
         logger.error(f"Video Link not found for Video Number:{post_title} {video_number}!")
 
-    def get_recent_posts_videos_download_link(self, matched_posts: dict) -> dict:
-        """
-        Check if post's url latest video is recent and gets the videos download links of it and its other recent posts.
-        How many of the other recent post videos are determined by video_num_per_post value.
-        """
-        logger.info(self.check_downlink_message)
-        all_download_details, start = {}, time.perf_counter()
-        for post_title, match_details in matched_posts.items():
-            anime_name, url = match_details[0], match_details[1]
-            soup = self.get_page_response(url)
-            latest_video_post = soup.find(string="更新：").parent.next_sibling.text.split("/")[0]
-            latest_video_number = self.video_post_num_extractor(latest_video_post)
-            num_videos = self.get_num_of_videos(latest_video_number)
-            video_start_num = latest_video_number - num_videos + 1
-            logger.info(f"Post Title: {post_title}, Latest Video Number: {latest_video_number}. "
-                        f"Last {num_videos} Video Numbers: {video_start_num}-{latest_video_number}")
-            for video_number in range(video_start_num, latest_video_number + 1):
-                post_video_name = f"{post_title} 第{video_number}集"
-                resolved_name = self.ch_gen.generate_title(post_video_name, anime_name)
-                if resolved_name in self.resolved_names_archive:
-                    logger.warning(f"Post Video Name: {post_video_name}, "
-                                   f"Resolved Name: {resolved_name} already in archive!")
-                    continue
-                video_link = self.get_post_video_link(soup, post_title, video_number)
-                download_link = self.get_video_download_link(video_link)
-                logger.info(f"Post Video Name: {post_video_name}, Video Link: {video_link}, "
-                            f"Download Link: {download_link}")
-                all_download_details[resolved_name] = post_video_name, download_link
-        end = time.perf_counter()
-        logger.info(f"{self.time_message}{round(end - start)}s")
-        return all_download_details
+    def get_post_episodes(self, post_title: str, match_details: tuple) -> list:
+        anime_name, url = match_details[0], match_details[1]
+        soup = self.get_page_response(url)
+        latest_video_post = soup.find(string="更新：").parent.next_sibling.text.split("/")[0]
+        latest_video_number = self.video_post_num_extractor(latest_video_post)
+        num_videos = self.get_num_of_videos(latest_video_number)
+        video_start_num = latest_video_number - num_videos + 1
+        logger.info(f"Post Title: {post_title}, Latest Video Number: {latest_video_number}. "
+                    f"Last {num_videos} Video Numbers: {video_start_num}-{latest_video_number}")
+        episode_links = self.index_episode_links(
+            (link.string, link.get('href')) for link in soup.find_all('a', class_="btn btn-default"))
+        return self.get_new_episodes(
+            post_title, anime_name, range(video_start_num, latest_video_number + 1),
+            lambda video_number: self.get_post_video_link(episode_links, post_title, video_number))
 
     def get_video_download_link(self, video_url: str) -> str | None:
         """
         This method uses the video url to find the video download link.
         """
         if video_url:
-            soup = self.get_page_response(video_url)
+            soup = self.get_page_response(video_url, page_type="episode")
             download_script = soup.find("div", class_="myui-player__video")
             if download_script:
                 download_match = re.search('"url":"(.*?)"', str(download_script))
@@ -643,8 +721,7 @@ class LQ010Scrapper(ScrapperTools):
 class TempScrapper(ScrapperTools):
     def __init__(self, site: str) -> None:
         self.base_url = f"https://{site}"
-        self.session = requests.Session()
-        self.resolved_names_archive = set(self.resolved_names_file.read_text(encoding="utf-8").splitlines())
+        self.session = HTTPClient.get_session()
 
     def get_page_response(self, url: str, request_type: int = 1) -> BeautifulSoup | None:
         if request_type == 1:
@@ -652,8 +729,9 @@ class TempScrapper(ScrapperTools):
             page_response.raise_for_status()
             return BeautifulSoup(page_response.text, self.parser)
         if request_type == 2:
-            self.sel_driver.get(url)
-            return BeautifulSoup(self.sel_driver.page_source, self.parser)
+            with self.browser_pool.page(self.base_url) as page:
+                page.get(url)
+                return BeautifulSoup(page.page_source, self.parser)
 
     def get_anime_posts(self, page: int = 1) -> dict:
         """
@@ -672,52 +750,25 @@ class TempScrapper(ScrapperTools):
             video_name_and_link[post_title] = post_url
         return video_name_and_link
 
-    def get_post_video_link(self, soup: BeautifulSoup, post_title: str, video_number: int) -> str | None:
-        video_post1 = soup.find('', class_="", string=f"{video_number}")
-        if video_post1:
-            return self.base_url + video_post1.get('href')
-        video_post2 = soup.find('', class_="", string=f"第{video_number}集")
-        if video_post2:
-            return self.base_url + video_post2.get('href')
-        video_post3 = soup.find('', class_="", string=f"{video_number:02d}")
-        if video_post3:
-            return self.base_url + video_post3.get('href')
-        video_post4 = soup.find('', class_="", string=f"第{video_number:02d}集")
-        if video_post4:
-            return self.base_url + video_post4.get('href')
+    def get_post_video_link(self, episode_links: dict, post_title: str, video_number: int) -> str | None:
+        if video_link := episode_links.get(video_number):
+            return video_link
         logger.error(f"Video Link not found for Video Number:{post_title} {video_number}!")
 
-    def get_recent_posts_videos_download_link(self, matched_posts: dict) -> dict:
-        """
-        Check if post's url latest video is recent and gets the videos download links of it and its other recent posts.
-        How many of the other recent post videos are determined by video_num_per_post value.
-        """
-        logger.info(self.check_downlink_message)
-        all_download_details, start = {}, time.perf_counter()
-        for post_title, match_details in matched_posts.items():
-            anime_name, url = match_details[0], match_details[1]
-            soup = self.get_page_response(url)
-            latest_video_post = soup.find(string="更新：").parent.next_sibling.text
-            latest_video_number = self.video_post_num_extractor(latest_video_post)
-            num_videos = self.get_num_of_videos(latest_video_number)
-            video_start_num = latest_video_number - num_videos + 1
-            logger.info(f"Post Title: {post_title}, Latest Video Number: {latest_video_number}. "
-                        f"Last {num_videos} Video Numbers: {video_start_num}-{latest_video_number}")
-            for video_number in range(video_start_num, latest_video_number + 1):
-                post_video_name = f"{post_title} 第{video_number}集"
-                resolved_name = self.ch_gen.generate_title(post_video_name, anime_name)
-                if resolved_name in self.resolved_names_archive:
-                    logger.warning(f"Post Video Name: {post_video_name}, "
-                                   f"Resolved Name: {resolved_name} already in archive!")
-                    continue
-                video_link = self.get_post_video_link(soup, post_title, video_number)
-                download_link = self.get_video_download_link(video_link)
-                logger.info(f"Post Video Name: {post_video_name}, Video Link: {video_link}, "
-                            f"Download Link: {download_link}")
-                all_download_details[resolved_name] = post_video_name, download_link
-        end = time.perf_counter()
-        logger.info(f"{self.time_message}{round(end - start)}s")
-        return all_download_details
+    def get_post_episodes(self, post_title: str, match_details: tuple) -> list:
+        anime_name, url = match_details[0], match_details[1]
+        soup = self.get_page_response(url)
+        latest_video_post = soup.find(string="更新：").parent.next_sibling.text
+        latest_video_number = self.video_post_num_extractor(latest_video_post)
+        num_videos = self.get_num_of_videos(latest_video_number)
+        video_start_num = latest_video_number - num_videos + 1
+        logger.info(f"Post Title: {post_title}, Latest Video Number: {latest_video_number}. "
+                    f"Last {num_videos} Video Numbers: {video_start_num}-{latest_video_number}")
+        episode_links = self.index_episode_links(
+            (link.string, link.get('href')) for link in soup.find_all('', class_=""))
+        return self.get_new_episodes(
+            post_title, anime_name, range(video_start_num, latest_video_number + 1),
+            lambda video_number: self.get_post_video_link(episode_links, post_title, video_number))
 
     def get_video_download_link(self, video_url: str) -> str | None:
         """
@@ -0,0 +1,326 @@
+import atexit
+import json
+import logging
+import re
+from contextlib import contextmanager
+from threading import Condition, Lock, Semaphore
+from time import perf_counter, sleep
+from typing import Callable, Iterator
+from uuid import uuid4
+
+import undetected_chromedriver as uc
+from selenium.common.exceptions import InvalidSessionIdException, NoSuchWindowException, WebDriverException
+from urllib3.exceptions import HTTPError
+
+logger = logging.getLogger(__name__)
+
+
+class PooledBrowser:
+    # Errors of a browser or tab that has crashed or can no longer be reached, as opposed to a failed script.
+    crash_errors = InvalidSessionIdException, NoSuchWindowException, ConnectionError, HTTPError
+    crash_pattern = re.compile(r"not reachable|disconnected|session deleted|tab crashed|target window already closed")
+
+    def __init__(self, driver: uc.Chrome) -> None:
+        """
+        A browser process shared by several tabs. The driver can only control one window at a time, so every
+        command switches to the tab it is meant for while holding the lock.
+        """
+        self.driver, self.lock, self.current_handle = driver, Lock(), driver.current_window_handle
+        self.captures = {}  # Target id of the capturing tabs as key and the urls the tab requested as value.
+        self.crashed = False  # Set when a command finds the browser can no longer be used.
+
+    @staticmethod
+    def get_target_id(handle: str) -> str:
+        """
+        The window handle of a tab is the DevTools target id that network events are tagged with.
+        """
+        return handle.removeprefix("CDwindow-").upper()
+
+    def check_crash(self, error: Exception) -> None:
+        """
+        Mark the browser as crashed when the error shows it can no longer be reached.
+        """
+        if isinstance(error, self.crash_errors) or self.crash_pattern.search(str(error)):
+            self.crashed = True
+
+    def read_network_log(self) -> None:
+        """
+        Move the requested urls from the browser's log to the tabs that are capturing. The log is shared by all the
+        tabs, so the events of the other tabs are kept for them instead of being lost. Must hold the lock.
+        """
+        try:
+            log_entries = self.driver.get_log("performance")
+        except (WebDriverException, *self.crash_errors) as error:
+            self.check_crash(error)
+            raise
+        for entry in log_entries:
+            event = json.loads(entry["message"])
+            message = event["message"]
+            if message.get("method") == "Network.requestWillBeSent":
+                target_id = str(event.get("webview", "")).upper()
+                if target_id in self.captures:
+                    self.captures[target_id].append(message["params"]["request"]["url"])
+
+    def start_capture(self, handle: str) -> None:
+        with self.lock:
+            self.read_network_log()  # Requests made before the capture started are not part of it.
+            self.captures[self.get_target_id(handle)] = []
+
+    def stop_capture(self, handle: str) -> None:
+        with self.lock:
+            self.captures.pop(self.get_target_id(handle), None)
+
+    def get_captured_urls(self, handle: str) -> list:
+        """
+        Get the urls requested by the tab since the last call.
+        """
+        with self.lock:
+            self.read_network_log()
+            target_id = self.get_target_id(handle)
+            urls, self.captures[target_id] = self.captures[target_id], []
+            return urls
+
+    def run(self, handle: str, command: Callable[[uc.Chrome], object]) -> object:
+        with self.lock:
+            try:
+                if self.current_handle != handle:
+                    self.driver.switch_to.window(handle)
+                    self.current_handle = handle
+                return command(self.driver)
+            except (WebDriverException, *self.crash_errors) as error:
+                self.check_crash(error)
+                raise
+
+
+class BrowserPage:
+    def __init__(self, browser: PooledBrowser, handle: str) -> None:
+        """
+        A tab borrowed from the browser pool. Pages are loaded with JavaScript navigation so the driver is not
+        blocked while the page loads and the other tabs of the browser can load at the same time.
+        """
+        self.browser, self.handle = browser, handle
+        self.poll_interval = 0.25
+
+    def run(self, command: Callable[[uc.Chrome], object]) -> object:
+        return self.browser.run(self.handle, command)
+
+    def navigate(self, script: str, *args, timeout: int = 60) -> None:
+        """
+        Run a navigation script then wait for the new document to finish loading. A marker is set on the old
+        document, so the old document being complete is not mistaken for the new one.
+        """
+        marker = uuid4().hex
+        self.run(lambda driver: driver.execute_script(f"window.poolMarker = arguments[0]; {script}", marker, *args))
+        deadline = perf_counter() + timeout
+        while perf_counter() < deadline:
+            sleep(self.poll_interval)
+            try:
+                if self.run(lambda driver: driver.execute_script(
+                        "return window.poolMarker !== arguments[0] && document.readyState === 'complete';", marker)):
+                    return
+            except WebDriverException:
+                if self.browser.crashed:  # Scripts can fail while the document is being replaced.
+                    raise
+        logger.warning(f"Page load timed out after {timeout}s. Tab: {self.handle}")
+
+    def get(self, url: str, timeout: int = 60) -> None:
+        self.navigate("window.location.href = arguments[1];", url, timeout=timeout)
+
+    def refresh(self, timeout: int = 60) -> None:
+        self.navigate("window.location.reload();", timeout=timeout)
+
+    def wait_until(self, ready_script: str, failed_script: str = None, timeout: int = 15) -> bool:
+        """
+        Poll the page until the ready script returns true.
+        :param ready_script: JavaScript that returns true once the page is ready.
+        :param failed_script: JavaScript that returns true when waiting longer will not make the page ready.
+        :return: True if the page became ready before the timeout and False otherwise.
+        """
+        deadline = perf_counter() + timeout
+        while perf_counter() < deadline:
+            try:
+                # Error pages can pass the ready script, so the failed script is checked first.
+                if failed_script and self.run(lambda driver: driver.execute_script(failed_script)):
+                    return False
+                if self.run(lambda driver: driver.execute_script(ready_script)):
+                    return True
+            except WebDriverException:
+                if self.browser.crashed:  # Scripts can fail while the document is being replaced.
+                    raise
+            sleep(self.poll_interval)
+        return False
+
+    def load(self, url: str, ready_script: str = None, failed_script: str = None, timeout: int = 15,
+             refreshes: int = 3) -> str:
+        """
+        Load the url and return the page source once the page is ready. The page is only refreshed when it did not
+        become ready before the timeout or the failed script detected a page that will not recover.
+        :param refreshes: The max number of refreshes.
+        """
+        start = perf_counter()
+        self.get(url)
+        if ready_script:
+            for attempt in range(refreshes + 1):
+                if attempt:
+                    logger.info(f"Page not ready, refreshing... attempt:{attempt}, Url: {url}")
+                    self.refresh()
+                if self.wait_until(ready_script, failed_script, timeout):
+                    break
+            else:
+                logger.warning(f"Page still not ready after {refreshes} refreshes. Url: {url}")
+        logger.debug(f"Page loaded in {perf_counter() - start:.2f}s. Url: {url}")
+        return self.page_source
+
+    def capture_links(self, url: str, pattern: re.Pattern, timeout: int = 10) -> list:
+        """
+        Load the url and watch the network requests made by this tab only. Returns as soon as a request
+        matches the pattern instead of waiting for the page to finish loading.
+        :return: The matches found in the requested urls. Empty if nothing matched before the timeout.
+        """
+        self.browser.start_capture(self.handle)
+        try:
+            start = perf_counter()
+            self.run(lambda driver: driver.execute_script("window.location.href = arguments[0];", url))
+            while perf_counter() - start < timeout:
+                urls = self.browser.get_captured_urls(self.handle)
+                if links := [link for requested_url in urls for link in pattern.findall(requested_url)]:
+                    logger.debug(f"Links captured in {perf_counter() - start:.2f}s. Url: {url}")
+                    return list(dict.fromkeys(links))
+                sleep(self.poll_interval)
+            logger.debug(f"No links captured after {timeout}s. Url: {url}")
+            return []
+        finally:
+            self.browser.stop_capture(self.handle)
+
+    @property
+    def page_source(self) -> str:
+        return self.run(lambda driver: driver.page_source)
+
+    @property
+    def current_url(self) -> str:
+        return self.run(lambda driver: driver.current_url)
+
+
+class BrowserPool:
+    def __init__(self, max_browsers: int = 2, tabs_per_browser: int = 3, site_limit: int = 2,
+                 chrome_kwargs: dict = None, version_getter: Callable[[], int | None] = None) -> None:
+        """
+        Pool of browser tabs that scrappers borrow for page loads. Several tabs share one browser process to keep
+        memory down and browsers are only started when every existing tab is in use. Browsers that are still open
+        when the program exits are closed.
+        :param max_browsers: The max number of browser processes.
+        :param tabs_per_browser: The number of tabs opened in each browser.
+        :param site_limit: The max number of tabs a single site can use at a time. Use site_limits to override it.
+        :param chrome_kwargs: Keyword arguments passed to uc.Chrome.
+        :param version_getter: Returns the main Chrome version. It is only called when the first browser starts.
+        """
+        self.max_browsers, self.tabs_per_browser, self.site_limit = max_browsers, tabs_per_browser, site_limit
+        self.chrome_kwargs, self.version_getter = chrome_kwargs or {}, version_getter
+        self.site_limits, self.site_semaphores = {}, {}  # Site as key and limit or semaphore as value.
+        self.browsers, self.free_pages, self.starting_browsers = [], [], 0
+        self.condition = Condition()  # Guards the browsers and the free pages.
+
+    def get_options(self) -> uc.ChromeOptions:
+        options = uc.ChromeOptions()
+        # Tabs in the background keep loading at full speed.
+        for argument in ("--disable-background-timer-throttling", "--disable-backgrounding-occluded-windows",
+                         "--disable-renderer-backgrounding"):
+            options.add_argument(argument)
+        # Network events are logged so tabs can capture the requests made by a page.
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+        return options
+
+    def start_browser(self) -> list:
+        """
+        Start a browser and open its tabs.
+        :return: The pages of the new browser.
+        """
+        start = perf_counter()
+        chrome_kwargs = self.chrome_kwargs
+        if self.version_getter:
+            chrome_kwargs = {"version_main": self.version_getter(), **chrome_kwargs}
+        driver = uc.Chrome(options=self.get_options(), **chrome_kwargs)
+        driver.minimize_window()
+        browser = PooledBrowser(driver)
+        handles = [driver.current_window_handle]
+        with browser.lock:
+            for _ in range(self.tabs_per_browser - 1):
+                driver.switch_to.new_window('tab')
+                handles.append(driver.current_window_handle)
+            browser.current_handle = handles[-1]
+        with self.condition:
+            if not self.browsers:
+                atexit.register(self.close)
+            self.browsers.append(browser)
+        logger.info(f"Browser {len(self.browsers)} started with {len(handles)} tabs. "
+                    f"Duration: {perf_counter() - start:.2f}s")
+        return [BrowserPage(browser, handle) for handle in handles]
+
+    def acquire(self) -> BrowserPage:
+        with self.condition:
+            while not self.free_pages and len(self.browsers) + self.starting_browsers >= self.max_browsers:
+                self.condition.wait()
+            if self.free_pages:
+                return self.free_pages.pop()
+            self.starting_browsers += 1
+        pages = []
+        try:  # The browser is started outside the lock so borrowed pages can be returned in the meantime.
+            pages = self.start_browser()
+        finally:
+            with self.condition:
+                self.starting_browsers -= 1
+                self.free_pages.extend(pages[1:])
+                self.condition.notify_all()
+        return pages[0]
+
+    def release(self, page: BrowserPage) -> None:
+        """
+        Return the tab to the pool. The tabs of a crashed browser are dropped with the browser, so a new browser
+        can be started in its place.
+        """
+        with self.condition:
+            if not page.browser.crashed:
+                self.free_pages.append(page)
+                self.condition.notify()
+                return
+            crashed = page.browser in self.browsers
+            if crashed:
+                self.browsers.remove(page.browser)
+                self.free_pages = [free_page for free_page in self.free_pages if free_page.browser is not page.browser]
+                self.condition.notify_all()
+        if crashed:
+            logger.warning(f"Browser crashed, its tabs are dropped. Browsers left: {len(self.browsers)}")
+            self.quit_browser(page.browser)
+
+    @staticmethod
+    def quit_browser(browser: PooledBrowser) -> None:
+        try:
+            browser.driver.quit()
+        except Exception as error:
+            logger.debug(f"An error occurred while closing browser, Error: {error}")
+
+    def get_site_semaphore(self, site: str) -> Semaphore:
+        with self.condition:
+            if site not in self.site_semaphores:
+                self.site_semaphores[site] = Semaphore(self.site_limits.get(site, self.site_limit))
+            return self.site_semaphores[site]
+
+    @contextmanager
+    def page(self, site: str) -> Iterator[BrowserPage]:
+        """
+        Borrow a tab for the site and return it to the pool once done.
+        :param site: Tabs used by the same site count towards the site's limit.
+        """
+        with self.get_site_semaphore(site):
+            page = self.acquire()
+            try:
+                yield page
+            finally:
+                self.release(page)
+
+    def close(self) -> None:
+        with self.condition:
+            browsers, self.browsers, self.free_pages = self.browsers, [], []
+        for browser in browsers:
+            self.quit_browser(browser)
@@ -0,0 +1,93 @@
+import logging
+from collections import Counter
+from threading import Lock
+from time import perf_counter
+
+logger = logging.getLogger(__name__)
+
+
+class ConcurrencyController:
+    def __init__(self, min_concurrent_dl: int, max_concurrent_dl: int, max_host_dl: int,
+                 start_concurrent_dl: int = None) -> None:
+        """
+        Adjust the number of parallel downloads from the measured throughput (AIMD).
+        The global limit is raised by one while the total throughput keeps going up and halved when the speed
+        of each download collapses. A host's limit is halved when it keeps returning errors and raised by one for
+        every interval without errors.
+        :param min_concurrent_dl: The global limit will not go below this number.
+        :param max_concurrent_dl: The global limit will not go above this number.
+        :param max_host_dl: The limit of a single host will not go above this number.
+        :param start_concurrent_dl: The global limit used before any throughput has been measured.
+        """
+        self.min_limit, self.max_limit, self.max_host_limit = min_concurrent_dl, max_concurrent_dl, max_host_dl
+        self.limit = start_concurrent_dl or min_concurrent_dl
+        self.host_limits = {}
+        self.increase_ratio, self.collapse_ratio, self.best_speed_decay = 1.05, 0.5, 0.95
+        self.host_error_threshold = 3  # The number of errors in an interval that lowers a host's limit.
+        self.lock = Lock()  # Guards the counters that are updated by the download threads.
+        self.interval_bytes, self.host_errors = Counter(), Counter()
+        self.interval_jobs = set()  # The downloads that reported bytes since the last adjustment.
+        self.last_adjust, self.last_throughput, self.best_speed = perf_counter(), 0.0, 0.0
+
+    def host_limit(self, host: str) -> int:
+        return self.host_limits.get(host, self.max_host_limit)
+
+    def record_bytes(self, host: str, num_bytes: int, job: str = None) -> None:
+        """
+        :param job: Identifies the download the bytes are for, the host is used if None.
+        """
+        with self.lock:
+            self.interval_bytes[host] += num_bytes
+            self.interval_jobs.add(job or host)
+
+    def record_error(self, host: str) -> None:
+        with self.lock:
+            self.host_errors[host] += 1
+
+    def adjust_host_limits(self, host_errors: Counter) -> None:
+        for host in set(host_errors) | set(self.host_limits):
+            old_limit = self.host_limit(host)
+            if host_errors[host] >= self.host_error_threshold:
+                new_limit = max(1, old_limit // 2)
+            elif not host_errors[host]:
+                new_limit = min(self.max_host_limit, old_limit + 1)
+            else:
+                new_limit = old_limit
+            if new_limit != old_limit:
+                logger.info(f"Host: {host} download limit changed from {old_limit} to {new_limit}. "
+                            f"Errors: {host_errors[host]}")
+            if new_limit == self.max_host_limit:
+                self.host_limits.pop(host, None)
+            else:
+                self.host_limits[host] = new_limit
+
+    def adjust(self, running_jobs: int) -> None:
+        """
+        Use the throughput measured since the last adjustment to change the limits.
+        The speed of a single download is measured over the downloads that reported bytes, downloads done by
+        ffmpeg alone do not report them and would make every download look slower.
+        :param running_jobs: The number of downloads that ran during the interval.
+        """
+        with self.lock:
+            interval_bytes, host_errors, interval_jobs = self.interval_bytes, self.host_errors, self.interval_jobs
+            self.interval_bytes, self.host_errors, self.interval_jobs = Counter(), Counter(), set()
+        now = perf_counter()
+        elapsed, self.last_adjust = now - self.last_adjust, now
+        self.adjust_host_limits(host_errors)
+        if not running_jobs or not interval_bytes.total() or not elapsed:
+            return  # Nothing was measured. Downloads done by ffmpeg alone are not measured.
+        throughput = interval_bytes.total() / elapsed
+        speed = throughput / len(interval_jobs)  # Throughput of a single measured download.
+        self.best_speed = max(speed, self.best_speed * self.best_speed_decay)
+        old_limit = self.limit
+        if speed < self.best_speed * self.collapse_ratio and throughput < self.last_throughput:
+            self.limit = max(self.min_limit, self.limit // 2)
+        elif throughput > self.last_throughput * self.increase_ratio and running_jobs >= self.limit:
+            self.limit = min(self.max_limit, self.limit + 1)
+        self.last_throughput = throughput
+        logger.debug(f"Throughput: {throughput / 1048576:.2f} MB/s, Speed per download: {speed / 1048576:.2f} MB/s, "
+                     f"Measured downloads: {len(interval_jobs)}, Running downloads: {running_jobs}, "
+                     f"Download limit: {self.limit}")
+        if self.limit != old_limit:
+            logger.info(f"Download limit changed from {old_limit} to {self.limit}. "
+                        f"Throughput: {throughput / 1048576:.2f} MB/s")
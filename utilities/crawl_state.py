@@ -0,0 +1,50 @@
+import logging
+from datetime import date, timedelta
+from pathlib import Path
+from threading import Lock
+
+from utilities.json_file import read_json, write_json
+
+logger = logging.getLogger(__name__)
+
+
+class CrawlState:
+    def __init__(self, state_file: Path, max_age_days: int = 30) -> None:
+        """
+        What each site's posts looked like when they were last crawled, so posts that can not have new episodes are
+        not crawled again. A post is settled once all of its recent episodes are in the archive.
+        :param state_file: JSON file the state is kept in across runs.
+        :param max_age_days: Posts not seen for longer than this are removed.
+        """
+        self.state_file, self.lock = state_file, Lock()  # Lock guards the posts.
+        self.posts = self.load(max_age_days)  # Site as key and post url as key of the post states as value.
+
+    def load(self, max_age_days: int) -> dict:
+        sites = read_json(self.state_file, {})
+        oldest = (date.today() - timedelta(days=max_age_days)).isoformat()
+        return {site: {post_url: post_state for post_url, post_state in posts.items() if post_state["seen"] >= oldest}
+                for site, posts in sites.items()}
+
+    def get(self, site: str, post_url: str) -> dict | None:
+        with self.lock:
+            return self.posts.get(site, {}).get(post_url)
+
+    def update(self, site: str, post_url: str, marker: str | None, settled: bool) -> None:
+        """
+        :param marker: The latest episode shown by the listing page. None if the site's listing does not show it.
+        :param settled: Whether the post had no episodes missing from the archive.
+        """
+        post_state = {"marker": marker, "settled": settled, "seen": date.today().isoformat()}
+        with self.lock:
+            self.posts.setdefault(site, {})[post_url] = post_state
+
+    def has_unsettled(self, site: str) -> bool:
+        """
+        Whether a post of the site still had episodes missing from the archive when it was last crawled.
+        """
+        with self.lock:
+            return any(not post_state["settled"] for post_state in self.posts.get(site, {}).values())
+
+    def save(self) -> None:
+        with self.lock:
+            write_json(self.state_file, self.posts)
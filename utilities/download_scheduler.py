@@ -0,0 +1,145 @@
+import logging
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from threading import Condition, Event, Thread
+from time import perf_counter
+from urllib.parse import urlparse
+
+from utilities.concurrency_controller import ConcurrencyController
+
+logger = logging.getLogger(__name__)
+
+
+class DownloadBatch:
+    def __init__(self, scrapper_name: str, downloader, num_of_jobs: int) -> None:
+        """
+        The downloads submitted by a single scrapper.
+        :param downloader: The ScrapperDownloader that runs the downloads and reports the results of the batch.
+        """
+        self.scrapper_name, self.downloader, self.remaining = scrapper_name, downloader, num_of_jobs
+        self.start = perf_counter()
+
+    def finish(self) -> None:
+        """
+        Update the archive and send the error messages once every download in the batch is done.
+        """
+        self.downloader.update_download_archive(), self.downloader.send_error_messages(self.scrapper_name)
+        logger.info(f"{self.scrapper_name} Downloads finished! Duration: {round(perf_counter() - self.start)}s\n")
+
+
+class DownloadScheduler:
+    def __init__(self, max_concurrent_dl: int, max_host_dl: int, controller: ConcurrencyController = None,
+                 adjust_interval: int = 10) -> None:
+        """
+        Run the downloads of all the scrappers with one shared concurrency budget while the scrappers keep scrapping.
+        Jobs are only started when both the global limit and the limit of the download link's host allow it,
+        so a busy host never holds up downloads from other hosts. Sites can post the same episode, a job waits for
+        earlier jobs with the same resolved name and is skipped if one of them downloaded it.
+        :param max_concurrent_dl: The max number of downloads that can happen at a time.
+        :param max_host_dl: The max number of downloads from a single host that can happen at a time.
+        :param controller: When given, the limits are taken from the controller and adjusted while downloads run.
+        :param adjust_interval: The number of seconds between adjustments of the controller's limits.
+        """
+        self.max_concurrent_dl, self.max_host_dl, self.controller = max_concurrent_dl, max_host_dl, controller
+        self.executor = ThreadPoolExecutor(controller.max_limit if controller else max_concurrent_dl)
+        self.condition = Condition()  # Guards the job counters and signals when all jobs are done.
+        self.pending_jobs, self.running_jobs, self.unfinished_jobs = deque(), Counter(), 0
+        self.active_names, self.downloaded_names = set(), set()
+        self.adjust_interval, self.stop_flag = adjust_interval, Event()
+        if controller:
+            Thread(target=self.adjust_limits, daemon=True).start()
+
+    def global_limit(self) -> int:
+        return self.controller.limit if self.controller else self.max_concurrent_dl
+
+    def host_limit(self, host: str) -> int:
+        return self.controller.host_limit(host) if self.controller else self.max_host_dl
+
+    def adjust_limits(self) -> None:
+        """
+        Periodically let the controller adjust the limits and start jobs if the limits were raised.
+        """
+        while not self.stop_flag.wait(self.adjust_interval):
+            with self.condition:
+                running_jobs = self.running_jobs.total()
+            self.controller.adjust(running_jobs)
+            self.dispatch()
+
+    @staticmethod
+    def get_host(download_link: str | None) -> str:
+        """
+        The host downloads are scheduled and limited by. Throughput is reported under the same host.
+        """
+        return urlparse(download_link or "").netloc
+
+    def submit_batch(self, scrapper_name: str, downloader, all_download_details: dict) -> None:
+        """
+        Queue the downloads of a scrapper without waiting for them to finish.
+        :param scrapper_name: Name of scrapper using downloader.
+        :param downloader: The ScrapperDownloader used for the downloads.
+        :param all_download_details: Should contain download link, file name and match name, in order.
+        """
+        logger.info(f"..........{scrapper_name} Queuing videos for download..........")
+        if not all_download_details:
+            logger.info("No Videos to download!\n")
+            return
+        logger.info(f"Download details: {all_download_details}")
+        batch = DownloadBatch(scrapper_name, downloader, len(all_download_details))
+        with self.condition:
+            for resolved_name, download_details in all_download_details.items():
+                self.pending_jobs.append((batch, self.get_host(download_details[1]), resolved_name, download_details))
+            self.unfinished_jobs += len(all_download_details)
+        self.dispatch()
+
+    def dispatch(self) -> None:
+        """
+        Start the pending jobs that fit within the global and host limits, in the order they were queued.
+        """
+        with self.condition:
+            blocked_names = set(self.active_names)
+            for job in list(self.pending_jobs):
+                if self.running_jobs.total() >= self.global_limit():
+                    break
+                host, resolved_name = job[1], job[2]
+                if resolved_name not in blocked_names and self.running_jobs[host] < self.host_limit(host):
+                    self.pending_jobs.remove(job)
+                    self.running_jobs[host] += 1
+                    self.active_names.add(resolved_name)
+                    self.executor.submit(self.run_job, *job)
+                blocked_names.add(resolved_name)
+
+    def run_job(self, batch: DownloadBatch, host: str, resolved_name: str, download_details: tuple) -> None:
+        downloaded = False
+        try:
+            if resolved_name in self.downloaded_names:
+                logger.warning(f"Resolved name: {resolved_name} already downloaded from another site. "
+                               f"Skipping download!")
+            else:
+                downloaded = batch.downloader.video_downloader(resolved_name, download_details)
+        except Exception as error:
+            logger.exception(f"\n\n{error}\n\n")
+        with self.condition:
+            if downloaded:
+                self.downloaded_names.add(resolved_name)
+            self.active_names.discard(resolved_name)
+            self.running_jobs[host] -= 1
+            batch.remaining -= 1
+            batch_finished = batch.remaining == 0
+        if batch_finished:
+            try:
+                batch.finish()
+            except Exception as error:
+                logger.exception(f"An error occurred while finishing {batch.scrapper_name} downloads! Error: {error}")
+        with self.condition:
+            self.unfinished_jobs -= 1
+            self.condition.notify_all()
+        self.dispatch()
+
+    def wait(self) -> None:
+        """
+        Block until every queued download is done then shut down the workers.
+        """
+        with self.condition:
+            self.condition.wait_for(lambda: self.unfinished_jobs == 0)
+        self.stop_flag.set()
+        self.executor.shutdown()
@@ -1,21 +1,31 @@
 import logging
+import re
+import shutil
 import socket
 import subprocess
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
 from pathlib import Path
 from time import perf_counter, sleep
 from urllib.parse import urlparse
 
-import requests
 from yt_dlp import YoutubeDL
 
+from utilities.download_scheduler import DownloadScheduler
+from utilities.http_client import HTTPClient
 from utilities.m3u8_adfilter import M3u8AdFilter
+from utilities.m3u8_playlist import M3u8Playlist, PlaylistCache
+from utilities.name_archive import NameArchive
+from utilities.segment_downloader import SegmentDownloader
 
 logger = logging.getLogger(__name__)
 
 
 class DownloadOptions:
-    tb = download_path = timeout_secs = ffmpeg_path = min_res_height = None
+    tb = download_path = timeout_secs = ffmpeg_path = min_res_height = headers = None
+    segment_concurrency = 8  # The number of segments of a single file that are fetched at the same time.
+    throughput_monitor = None  # ConcurrencyController that measures the throughput of the segment downloads.
+    staging_path = None  # Local folder that files are written to before they are moved to the download path.
+    file_transfer = None  # FileTransfer that moves the staged files to the download path.
     host_name = socket.gethostname()
 
 
@@ -66,22 +76,51 @@ class YouTubeDownloader(DownloadOptions):
 
 
 class ScrapperDownloader(DownloadOptions):
-    def __init__(self, resolved_names_file: Path) -> None:
-        self.resolved_names_file = resolved_names_file
+    resolution_cache = {}  # Download link as key and video width and height as value.
+    playlist_cache = PlaylistCache()  # Playlists are fetched and parsed once per run.
+    probe_size = 512 * 1024  # The number of bytes fetched from direct links for the resolution check.
+    trust_declared_res = True  # Use the resolution declared by master playlists instead of probing the video.
+    # ffmpeg errors caused by a bad input file and the segment files named in the ffmpeg output.
+    corrupt_input_pattern = re.compile(r"Invalid data found|corrupt|Error while decoding|error reading header", re.I)
+    segment_name_pattern = re.compile(r"segment_\d{5}\.ts")
+
+    def __init__(self, name_archive: NameArchive | None) -> None:
+        self.name_archive = name_archive
         self.new_dl_resolved_names, self.error_msgs = [], ""
+        self.prefetched_segments = {}  # Download link as key and the segments fetched by the resolution check.
         self.cmd_output = subprocess.DEVNULL if "VOUN-SERVER" in self.host_name else None
         self.ffmpeg_dwn_cmd = [f"{self.ffmpeg_path}/ffmpeg", "-err_detect", "explode", "-xerror"]
+        self.segments_dir_suffix, self.segments_max_age = "_segments", timedelta(days=3)
+        # Files are written to local disk first when staging is used. The network share is only written by the mover.
+        self.staged = bool(self.staging_path and self.file_transfer)
+        if self.staged:
+            self.output_path = Path(self.staging_path)
+            self.output_path.mkdir(parents=True, exist_ok=True)
+        else:
+            self.output_path = Path(self.download_path or "")
+        self.remove_stale_segments()
 
     def update_download_archive(self) -> None:
         """
         Updated the names download archive with the new names.
         """
-        if self.new_dl_resolved_names:
-            logger.info(f"Archive updated with new names. Names: {self.new_dl_resolved_names}")
-            with open(self.resolved_names_file, 'a', encoding="utf-8") as text_file:
-                text_file.writelines(self.new_dl_resolved_names)
+        if self.new_dl_resolved_names and self.name_archive:
+            added_names = self.name_archive.add(self.new_dl_resolved_names)
+            logger.info(f"Archive updated with new names. Names: {added_names}")
             self.new_dl_resolved_names = []  # Empty list after every update to prevent duplicates.
 
+    def remove_stale_segments(self) -> None:
+        """
+        Remove segment folders of downloads that have not been resumed for a while.
+        """
+        if not self.download_path:
+            return
+        for work_dir in self.output_path.glob(f"*{self.segments_dir_suffix}"):
+            last_modified = datetime.fromtimestamp(work_dir.stat().st_mtime)
+            if work_dir.is_dir() and datetime.now() - last_modified > self.segments_max_age:
+                logger.info(f"Removing stale segments folder: {work_dir.name}")
+                shutil.rmtree(work_dir, ignore_errors=True)
+
     def send_error_messages(self, scrapper_name: str) -> None:
         if self.error_msgs:
             self.tb.send_telegram_message(f"Scrapper Name: {scrapper_name}\n{self.error_msgs}")
@@ -100,31 +139,98 @@ class ScrapperDownloader(DownloadOptions):
         else:
             logger.error("Failed to delete file after multiple attempts.")
 
-    def video_res_check(self, resolved_name: str, file_name: str, download_link: str) -> bool:
+    def file_exists(self, file_path: Path) -> bool:
         """
-        Returns True if video's height resolution is lower than the allowed minimum and False otherwise.
-        The first 10 seconds of the video are downloaded for testing.
+        Check the staging folder and the cached listing of the download path when staging is used,
+        otherwise check the download path directly.
+        """
+        if not self.staged:
+            return file_path.exists()
+        return file_path.exists() or self.file_transfer.exists(file_path.name)
+
+    def get_link_start(self, download_link: str) -> bytes:
+        """
+        Fetch only the first part of a direct link into memory.
+        """
+        data = bytearray()
+        session = HTTPClient.get_session()
+        with session.get(download_link, headers=self.headers, stream=True, timeout=(10, 60)) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(65536):
+                data.extend(chunk)
+                if len(data) >= self.probe_size:
+                    break  # The rest of the file is not needed.
+        return bytes(data)
+
+    def get_first_segment(self, playlist: M3u8Playlist) -> tuple[str, bytes]:
+        """
+        Fetch the first segment of the media playlist into memory.
+        :return: The link of the segment and the segment. The segment is empty if it can not be probed on its own.
+        """
+        if not playlist.segments or playlist.resources:  # Encrypted segments can not be probed on their own.
+            return playlist.url, b""
+        segment_link = playlist.segments[0]
+        segment_response = HTTPClient.get_session().get(segment_link, headers=self.headers, timeout=(10, 60))
+        segment_response.raise_for_status()
+        return segment_link, segment_response.content
+
+    def run_ffprobe(self, source: str, data: bytes = None) -> tuple[int, int]:
+        """
+        Use ffprobe to get the width and height of the first video stream.
+        :param source: The link or file to be probed. Use pipe:0 when the data is given.
+        :param data: The video data that will be passed to ffprobe in memory.
+        """
+        ffprobe_cmd = [f"{self.ffmpeg_path}/ffprobe", '-v', 'error', '-select_streams', 'v:0', '-show_entries',
+                       'stream=width,height', '-of', 'csv=p=0', '-i', source]
+        output = subprocess.run(ffprobe_cmd, input=data, capture_output=True, timeout=self.timeout_secs / 6.0,
+                                check=True).stdout
+        resolution = output.decode().strip().splitlines()[0].split(',')
+        return int(resolution[0]), int(resolution[1])
+
+    def probe_resolution(self, download_link: str) -> tuple[int, int]:
+        """
+        Get the resolution of the video from the start of the video held in memory. The resolution declared by a
+        master playlist is used without probing. Ffprobe reads the link itself only when the data could not be
+        fetched or probed.
         """
-        temp_file = Path(f"{self.download_path}/{file_name}_res_check_temp.mp4")
-        duration = "10"  # Set the duration of the first fragment to download (in seconds).
-        ffmpeg_cmd = [f"{self.ffmpeg_path}/ffmpeg", '-t', duration, '-i', download_link, '-c', 'copy', str(temp_file)]
         try:
-            subprocess.run(ffmpeg_cmd, stderr=self.cmd_output, timeout=self.timeout_secs / 6.0, check=True)
+            if playlist := self.playlist_cache.get(download_link, self.headers):
+                if playlist.is_master:
+                    variant = playlist.best_variant()
+                    if self.trust_declared_res and variant.has_resolution:
+                        logger.debug(f"Resolution declared by master playlist used. Variant: {variant}")
+                        return variant.width, variant.height
+                probe_link, probe_data = self.get_first_segment(self.get_m3u8_playlist(playlist))
+            else:
+                probe_link, probe_data = download_link, self.get_link_start(download_link)
+            if probe_data:
+                resolution = self.run_ffprobe("pipe:0", probe_data)
+                if probe_link != download_link:  # Keep the segment so the download does not fetch it again.
+                    self.prefetched_segments[download_link] = {probe_link: probe_data}
+                return resolution
         except Exception as error:
-            logger.debug(f"An error occurred while downloading {temp_file}, Error: {error}")
-            self.file_remover(temp_file, True)
-        # Get the resolution of the downloaded video.
-        ffprobe_cmd = [f"{self.ffmpeg_path}/ffprobe", '-show_entries', 'stream=width,height', '-of', 'csv=p=0',
-                       str(temp_file)]
-        if not temp_file.exists():
-            error_msg = f"Resolution check temp file for {file_name} not found, download failed!"
-            logger.error(error_msg)
-            self.error_msgs = f"{self.error_msgs}\n{error_msg}"
-            return True
-        resolution = subprocess.check_output(ffprobe_cmd, stderr=self.cmd_output).decode().strip().split(',')
-        width, height = int(resolution[0]), int(resolution[1])
-        self.file_remover(temp_file)  # Delete the downloaded file.
+            logger.debug(f"An error occurred while probing {download_link} in memory, Error: {error}")
+        return self.run_ffprobe(download_link)
+
+    def video_res_check(self, resolved_name: str, file_name: str, download_link: str) -> bool:
+        """
+        Returns True if video's height resolution is lower than the allowed minimum and False otherwise.
+        Only the start of the video is fetched for testing. Results are cached by download link.
+        """
+        if download_link in self.resolution_cache:
+            width, height = self.resolution_cache[download_link]
+            logger.debug(f"Cached resolution used for {file_name}. Resolution: {width} x {height}")
+        else:
+            try:
+                width, height = self.probe_resolution(download_link)
+            except Exception as error:
+                error_msg = f"Resolution check for {file_name} failed, download failed! Error: {error}"
+                logger.error(error_msg)
+                self.error_msgs = f"{self.error_msgs}\n{error_msg}"
+                return True
+            self.resolution_cache[download_link] = width, height
         if not height >= self.min_res_height:
+            self.prefetched_segments.pop(download_link, None)
             error_msg = (f"Resolved name: {resolved_name}, File: {file_name} failed resolution test! "
                          f"Resolution: {width} x {height}. Skipping download!")
             logger.error(error_msg)
@@ -133,60 +239,107 @@ class ScrapperDownloader(DownloadOptions):
         else:
             return False
 
+    def run_ffmpeg(self, ffmpeg_cmd: list, file_path: Path, capture_errors: bool = False) -> None:
+        """
+        Run the ffmpeg command with the output written under a temporary name that is renamed once ffmpeg succeeds,
+        so a killed run never leaves a partial file under the final name.
+        :param ffmpeg_cmd: The ffmpeg command without the output file.
+        :param file_path: The file path for the file to be downloaded.
+        :param capture_errors: Keep the ffmpeg output in the raised error instead of showing it.
+        """
+        temp_path = file_path.with_name(f"{file_path.name}.part")
+        stderr = subprocess.PIPE if capture_errors else self.cmd_output
+        try:
+            subprocess.run([*ffmpeg_cmd, '-f', 'mp4', str(temp_path)], stderr=stderr, timeout=self.timeout_secs,
+                           check=True, text=capture_errors, errors="replace" if capture_errors else None)
+            temp_path.replace(file_path)
+        finally:
+            self.file_remover(temp_path, True)
+
     def m3u8_downloader(self, m3u8_file: Path, file_path: Path) -> None:
         """
-        Download file with m3u8 playlist.
+        Download file with m3u8 playlist. Errors are raised with the ffmpeg output so the caller can tell a corrupt
+        segment from a remux that was cut short.
         :param m3u8_file: The m3u8 playlist.
         :param file_path: The file path for the file to be downloaded.
         """
-        ffmpeg_cmd = [*self.ffmpeg_dwn_cmd, '-protocol_whitelist', 'file,http,https,tcp,tls', '-i', str(m3u8_file),
-                      '-c', 'copy', str(file_path)]
+        ffmpeg_cmd = [*self.ffmpeg_dwn_cmd, '-allowed_extensions', 'ALL', '-protocol_whitelist',
+                      'file,crypto,http,https,tcp,tls', '-i', str(m3u8_file), '-c', 'copy']
+        try:
+            self.run_ffmpeg(ffmpeg_cmd, file_path, True)
+        finally:
+            # Clean up the m3u8 playlist file.
+            self.file_remover(m3u8_file)
+
+    def segment_downloader(self, file_name: str, playlist: M3u8Playlist, prefetched: dict = None,
+                           host: str = None) -> None:
+        """
+        Fetch the playlist segments concurrently into a local folder then remux them into a mp4 file.
+        The segments folder is kept when fetching or remuxing fails so the next attempt only fetches the missing
+        segments. When ffmpeg reports corrupt input the segment it was reading is dropped so it is fetched again,
+        the whole folder is removed only if that segment can not be found.
+        :param host: The host the download is scheduled under.
+        """
+        logger.debug(f"Segment downloader being used for {file_name}. Playlist: {playlist}")
+        file_path = self.output_path / f"{file_name}.mp4"
+        work_dir = self.output_path / f"{file_name}{self.segments_dir_suffix}"
+        seg_dl = SegmentDownloader(playlist, work_dir, self.segment_concurrency, self.headers, self.timeout_secs,
+                                   prefetched, self.throughput_monitor, host)
         try:
-            subprocess.run(ffmpeg_cmd, stderr=self.cmd_output, timeout=self.timeout_secs, check=True)
+            local_playlist = seg_dl.download()
         except Exception as error:
-            logger.debug(f"An error occurred while downloading {file_path.name}, Error: {error}")
-            self.file_remover(file_path, True)
-        # Clean up the m3u8 playlist file.
-        self.file_remover(m3u8_file)
+            logger.warning(f"An error occurred while fetching segments of {file_name}, "
+                           f"fetched segments are kept for the next attempt. Error: {error}")
+            return
+        # Use ffmpeg to remux the local segments.
+        try:
+            self.m3u8_downloader(local_playlist, file_path)
+        except subprocess.CalledProcessError as error:
+            logger.debug(f"Remuxing {file_name} failed, ffmpeg output:\n{error.stderr}")
+            if not self.corrupt_input_pattern.search(error.stderr or ""):
+                logger.warning(f"Remuxing {file_name} failed, segments are kept for the next attempt. Error: {error}")
+            elif bad_segments := self.segment_name_pattern.findall(error.stderr):
+                logger.warning(f"Segment {bad_segments[-1]} of {file_name} is corrupt, it will be fetched again.")
+                seg_dl.discard(bad_segments[-1])
+            else:
+                logger.warning(f"Segments of {file_name} are corrupt, all segments will be fetched again.")
+                shutil.rmtree(work_dir, ignore_errors=True)
+        except Exception as error:
+            logger.warning(f"Remuxing {file_name} failed, segments are kept for the next attempt. Error: {error}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
 
-    def ad_free_playlist_downloader(self, file_name: str, response_text: str, download_link: str) -> None:
+    def ad_free_playlist_downloader(self, file_name: str, playlist: M3u8Playlist, prefetched: dict = None,
+                                    host: str = None) -> None:
         """
         Remove embedded advertisements from m3u8 playlist.
         """
         logger.debug(f"Advertisement detected in {file_name}!")
-        file_path = Path(f"{self.download_path}/{file_name}.mp4")
         # Remove advertisement from text.
         af = M3u8AdFilter()
-        # Make sure the playlist segments all have base links
-        base_link = self.get_base_link(download_link)
-        response_text = self.insert_base_link(base_link, response_text)
         try:
-            ad_free_m3u8_text = af.run_filters(response_text)
+            ad_free_m3u8_text = af.run_filters(playlist.text)
         except Exception as error:
-            ad_free_m3u8_text = response_text
+            ad_free_m3u8_text = playlist.text
             error_message = f"An error occurred while trying to remove ads Error:\n{error}\nFile name: {file_name}\n"
-            logger.error(f"{error_message}Response text:\n{response_text}")
+            logger.error(f"{error_message}Response text:\n{playlist.text}")
             self.error_msgs = f"{self.error_msgs}\n{error_message}"
-        # Create temp ad filtered m3u8 playlist.
-        temp_m3u8_file = Path(f"{self.download_path}/{file_name}_filtered_playlist.m3u8")
-        temp_m3u8_file.write_text(ad_free_m3u8_text)
-        # Use ffmpeg to download and convert the modified playlist.
-        self.m3u8_downloader(temp_m3u8_file, file_path)
+        # Download the segments of the ad filtered playlist.
+        ad_free_playlist = M3u8Playlist(playlist.url, ad_free_m3u8_text, playlist.fetched_at)
+        self.segment_downloader(file_name, ad_free_playlist, prefetched, host)
 
     def link_downloader(self, file_name: str, download_link: str) -> None:
         """
         Download file with link.
         """
         logger.debug(f"Link downloader being used for {file_name}.")
-        file_path = Path(f"{self.download_path}/{file_name}.mp4")
+        file_path = self.output_path / f"{file_name}.mp4"
         # Set the ffmpeg command as a list.
-        ffmpeg_cmd = [*self.ffmpeg_dwn_cmd, '-i', download_link, '-c', 'copy', str(file_path)]
+        ffmpeg_cmd = [*self.ffmpeg_dwn_cmd, '-i', download_link, '-c', 'copy']
         try:
-            # Run the command using subprocess.run().
-            subprocess.run(ffmpeg_cmd, stderr=self.cmd_output, timeout=self.timeout_secs, check=True)
+            self.run_ffmpeg(ffmpeg_cmd, file_path)
         except Exception as error:
             logger.debug(f"An error occurred while downloading {file_name}, Error: {error}")
-            self.file_remover(file_path, True)
 
     @staticmethod
     def get_base_link(url: str) -> str:
@@ -196,85 +349,79 @@ class ScrapperDownloader(DownloadOptions):
         parsed_link = urlparse(url)
         return f"{parsed_link.scheme}://{parsed_link.netloc}"
 
-    @staticmethod
-    def insert_base_link(base_link: str, response_text: str) -> str:
-        """
-        Insert a base link into m3u8 playlist segments without base link.
-        """
-        return "\n".join(f"{base_link}{line}" if ".ts" in line and not line.startswith("http") else line
-                         for line in response_text.splitlines())
-
-    def get_m3u8_playlist(self, response_link: str, response_text: str) -> str:
+    def get_m3u8_playlist(self, playlist: M3u8Playlist) -> M3u8Playlist:
         """
-        Generate playlist from m3u8 link that has no playlist.
-        A base url is prepended to the relative links in the playlist.
+        Get the media playlist from a playlist that has no segments.
+        The variant with the best resolution is used when the playlist is a master playlist.
         """
+        if playlist.segments and "#EXTINF" in playlist.text:  # check for duration tag
+            return playlist
         logger.debug("Extracting playlist link from response...")
-        download_links = [line for line in response_text.splitlines() if line.endswith(".m3u8")]
-        logger.debug(f"Playlist links extracted: {download_links}")
-        if not download_links:
-            return response_text
+        if variant := playlist.best_variant():
+            logger.debug(f"Variant selected from master playlist: {variant}")
+            download_link = variant.link
         else:
-            download_link = download_links[0]
-
-        base_link = self.get_base_link(response_link)
-
-        if not download_link.startswith("http"):
-            if not download_link.startswith("/"):
-                download_link = f"/{download_link}"
-            download_link = f"{base_link}{download_link}"
+            download_links = [line for line in playlist.lines if line.endswith(".m3u8")]
+            logger.debug(f"Playlist links extracted: {download_links}")
+            if not download_links:
+                return playlist
+            else:
+                download_link = download_links[0]
+            if not download_link.startswith("http"):
+                if not download_link.startswith("/"):
+                    download_link = f"/{download_link}"
+                download_link = f"{self.get_base_link(playlist.url)}{download_link}"
         logger.debug(f"New download link for playlist: {download_link}")
-        response_text = requests.get(download_link).text
-        response_text = self.insert_base_link(base_link, response_text)
-        return response_text
+        return self.playlist_cache.get(download_link, self.headers) or playlist
 
     def dispatch_downloader(self, download_link: str, file_name: str) -> None:
         """
         Selects the method for initiating the download by checking for ad in playlist.
+        The playlist fetched by the resolution check is reused from the playlist cache.
         """
-        response_text = ""
-        for i in range(3):
-            try:
-                response = requests.get(download_link)
-                response_text = response.text
-                break
-            except requests.exceptions.ConnectTimeout:
-                logger.warning(f"Attempt {i + 1}: For ad check in File: {file_name} failed...")
-                sleep(5)  # Wait before retrying
+        prefetched = self.prefetched_segments.pop(download_link, None)
+        host = DownloadScheduler.get_host(download_link)  # Segments may come from another host than the link.
+        if playlist := self.playlist_cache.get(download_link, self.headers):
+            playlist = self.get_m3u8_playlist(playlist)
         else:
-            logger.info(f"Check for ad in playlist failed. Name: {file_name}")
-        if response_text and "#EXTINF" not in response_text:  # check for duration tag
-            response_text = self.get_m3u8_playlist(download_link, response_text)
-        if "#EXT-X-DISCONTINUITY" in response_text:
-            self.ad_free_playlist_downloader(file_name, response_text, download_link)
+            logger.info(f"Check for ad in playlist failed or link is not a playlist. Name: {file_name}")
+        if playlist and "#EXT-X-DISCONTINUITY" in playlist.text:
+            self.ad_free_playlist_downloader(file_name, playlist, prefetched, host)
+        elif playlist and playlist.segments:
+            self.segment_downloader(file_name, playlist, prefetched, host)
         else:
             self.link_downloader(file_name, download_link)
 
-    def video_downloader(self, resolved_name: str, download_details: tuple) -> None:
+    def video_downloader(self, resolved_name: str, download_details: tuple) -> bool:
         """
         Use m3u8 link to download video and create mp4 file. Embedded advertisements links will be removed.
+        :return: True if the video was downloaded successfully and False otherwise.
         """
         file_name, download_link = download_details[0], download_details[1]
-        file_path = Path(f"{self.download_path}/{file_name}.mp4")
-        if file_path.exists():
+        file_path = self.output_path / f"{file_name}.mp4"
+        if self.file_exists(file_path):
             logger.warning(f"Resolved name: {resolved_name}, File: {file_name} exists in directory. Skipping download!")
-            return
+            return False
         if not download_link:
             error_msg = f"Resolved name: {resolved_name}, File: {file_name} has no download link. Skipping download!"
             logger.warning(error_msg)
             self.error_msgs = f"{self.error_msgs}\n{error_msg}"
-            return
+            return False
         if self.video_res_check(resolved_name, file_name, download_link):
-            return
+            return False
 
         self.dispatch_downloader(download_link, file_name)
         if file_path.exists():
             logger.info(f"Resolved name: {resolved_name}, File: {file_path.name}, downloaded successfully!")
-            self.new_dl_resolved_names.append(resolved_name + "\n")
+            self.new_dl_resolved_names.append(resolved_name)
+            if self.staged:
+                self.file_transfer.submit(file_path)  # The worker is freed while the file is moved to the share.
+            return True
         else:
             error_message = f"Resolved name: {resolved_name}, File: {file_path.name}, download failed!"
             logger.warning(error_message)
             self.error_msgs = f"{self.error_msgs}\n{error_message}"
+            return False
 
     def batch_downloader(self, scrapper_name: str, all_download_details: dict, max_concurrent_dl: int) -> None:
         """
@@ -283,17 +430,6 @@ class ScrapperDownloader(DownloadOptions):
         :param all_download_details: Should contain download link, file name and match name, in order.
         :param max_concurrent_dl: The max number of downloads that can happen at a time.
         """
-        logger.info(f"..........{scrapper_name} Using multithreading to download videos..........")
-        if not all_download_details:
-            logger.info("No Videos to download!\n")
-            return
-        logger.info(f"Download details: {all_download_details}")
-        start = perf_counter()
-        with ThreadPoolExecutor(max_concurrent_dl) as executor:
-            futures = [executor.submit(self.video_downloader, resolved_name, download_details)
-                       for resolved_name, download_details in all_download_details.items()]
-            for _, f in enumerate(as_completed(futures)):  # as each  process completes
-                if error := f.exception():
-                    logger.exception(f"\n\n{error}\n\n")
-        self.update_download_archive(), self.send_error_messages(scrapper_name)
-        logger.info(f"Downloads finished! Duration: {round(perf_counter() - start)}s\n")
+        scheduler = DownloadScheduler(max_concurrent_dl, max_concurrent_dl)
+        scheduler.submit_batch(scrapper_name, self, all_download_details)
+        scheduler.wait()
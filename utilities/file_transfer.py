@@ -0,0 +1,113 @@
+import logging
+import os
+import shutil
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from threading import Lock
+from time import perf_counter, sleep
+
+logger = logging.getLogger(__name__)
+
+
+class FileTransfer:
+    def __init__(self, destination_dir: Path, max_transfers: int = 2, retries: int = 3,
+                 listing_max_age: int = 300) -> None:
+        """
+        Move finished files from the local staging folder to the destination folder in the background.
+        A file is copied next to its destination under a temporary name and renamed once complete, so a partially
+        copied file never appears in the destination folder.
+        :param destination_dir: The folder the files are moved to. This is usually a network share.
+        :param max_transfers: The max number of files that are moved at a time.
+        :param retries: The number of times a failed move is attempted again.
+        :param listing_max_age: The number of seconds the cached listing of the destination folder is used for.
+        """
+        self.destination_dir, self.retries, self.retry_delay = Path(destination_dir), retries, 10
+        self.executor = ThreadPoolExecutor(max_transfers, thread_name_prefix="file_transfer")
+        self.listing_max_age, self.listing, self.listed_at = listing_max_age, set(), None
+        self.pending_names, self.lock = set(), Lock()  # Lock guards the listing and the pending names.
+
+    def refresh_listing(self) -> None:
+        start = perf_counter()
+        listing = {entry.name for entry in os.scandir(self.destination_dir) if entry.is_file()}
+        with self.lock:
+            self.listing, self.listed_at = listing, perf_counter()
+        logger.debug(f"Listing of {self.destination_dir} refreshed. Files: {len(listing)}, "
+                     f"Duration: {perf_counter() - start:.2f}s")
+
+    def exists(self, file_name: str) -> bool:
+        """
+        Check if the file is in the destination folder or is being moved there, without a network request for
+        every check. The folder is listed again once the cached listing is older than the max age.
+        """
+        if self.listed_at is None or perf_counter() - self.listed_at > self.listing_max_age:
+            self.refresh_listing()
+        with self.lock:
+            return file_name in self.listing or file_name in self.pending_names
+
+    def submit(self, file_path: Path) -> Future:
+        """
+        Queue the file to be moved to the destination folder and return without waiting for the move.
+        """
+        with self.lock:
+            self.pending_names.add(file_path.name)
+        return self.executor.submit(self.transfer, file_path)
+
+    def move_file(self, file_path: Path) -> None:
+        destination = self.destination_dir / file_path.name
+        temp_destination = destination.with_name(f"{destination.name}.part")
+        try:
+            os.replace(file_path, destination)  # Files on the same drive are only renamed.
+            return
+        except OSError:
+            pass
+        shutil.copyfile(file_path, temp_destination)
+        os.replace(temp_destination, destination)
+        file_path.unlink()
+
+    def transfer(self, file_path: Path) -> bool:
+        """
+        Move the file with retries. The file is left in the staging folder when every attempt fails,
+        so it can be moved on the next run.
+        :return: True if the file was moved and False otherwise.
+        """
+        start = perf_counter()
+        moved = False
+        for attempt in range(self.retries + 1):
+            try:
+                self.move_file(file_path)
+                moved = True
+                break
+            except Exception as error:
+                logger.warning(f"Attempt {attempt + 1}: Moving {file_path.name} to {self.destination_dir} failed! "
+                               f"Error: {error}")
+                if attempt < self.retries:
+                    sleep(self.retry_delay * (attempt + 1))
+        with self.lock:
+            self.pending_names.discard(file_path.name)
+            if moved:
+                self.listing.add(file_path.name)
+        if moved:
+            logger.info(f"File: {file_path.name} moved to {self.destination_dir}. "
+                        f"Duration: {perf_counter() - start:.2f}s")
+        else:
+            logger.error(f"File: {file_path.name} could not be moved, it is kept in {file_path.parent}.")
+        return moved
+
+    def resume(self, staging_dir: Path, suffix: str = ".mp4") -> None:
+        """
+        Queue the files left in the staging folder by an earlier run and remove incomplete copies and downloads.
+        Downloads are written under a temporary name until they are complete, so only complete files are queued.
+        """
+        for temp_file in [*self.destination_dir.glob(f"*{suffix}.part"), *Path(staging_dir).glob(f"*{suffix}.part")]:
+            logger.info(f"Removing incomplete file: {temp_file}")
+            temp_file.unlink(missing_ok=True)
+        for file_path in Path(staging_dir).glob(f"*{suffix}"):
+            logger.info(f"Staged file left by an earlier run queued for moving. File: {file_path.name}")
+            self.submit(file_path)
+
+    def wait(self) -> None:
+        """
+        Block until every queued file has been moved.
+        """
+        logger.info("..........Waiting for staged files to be moved..........")
+        self.executor.shutdown()
@@ -0,0 +1,58 @@
+import logging
+from threading import Lock
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+
+class HTTPClient:
+    headers = None  # Default headers sent with every request.
+    pool_connections, pool_maxsize = 32, 64  # Number of hosts with kept pools and connections kept per host.
+    host_pool_sizes = {}  # Host as key and number of connections kept for the host as value.
+    session, lock = None, Lock()
+
+    @classmethod
+    def get_session(cls) -> requests.Session:
+        """
+        Return the session shared by the whole program. Connections are kept alive in a pool for each host,
+        so requests to the same host do not pay for a new TCP and TLS handshake.
+        """
+        with cls.lock:
+            if cls.session is None:
+                session = requests.Session()
+                if cls.headers:
+                    session.headers.update(cls.headers)
+                adapter = HTTPAdapter(pool_connections=cls.pool_connections, pool_maxsize=cls.pool_maxsize)
+                session.mount("http://", adapter), session.mount("https://", adapter)
+                for host, pool_size in cls.host_pool_sizes.items():
+                    host_adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+                    session.mount(f"http://{host}", host_adapter), session.mount(f"https://{host}", host_adapter)
+                logger.debug(f"Shared HTTP session created. Pool size: {cls.pool_maxsize}, "
+                             f"Host pool sizes: {cls.host_pool_sizes}")
+                cls.session = session
+            return cls.session
+
+    @classmethod
+    def connection_stats(cls) -> dict:
+        """
+        Count the connections that were opened and the requests that reused an open connection.
+        Only the pools that are still kept are counted.
+        """
+        opened = requests_made = 0
+        if cls.session:
+            for adapter in set(cls.session.adapters.values()):
+                pools = adapter.poolmanager.pools
+                for key in pools.keys():
+                    if pool := pools.get(key):
+                        opened, requests_made = opened + pool.num_connections, requests_made + pool.num_requests
+        return {"opened": opened, "reused": max(requests_made - opened, 0), "requests": requests_made}
+
+    @classmethod
+    def close(cls) -> None:
+        with cls.lock:
+            if cls.session:
+                logger.info(f"HTTP connections: {cls.connection_stats()}")
+                cls.session.close()
+                cls.session = None
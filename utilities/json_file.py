@@ -0,0 +1,22 @@
+import json
+from pathlib import Path
+
+
+def read_json(json_file: Path, default: object = None) -> object:
+    """
+    Read a JSON file kept across runs.
+    :return: The data of the file or the default if the file is missing, can not be read or is not valid JSON.
+    """
+    try:
+        return json.loads(json_file.read_text(encoding="utf-8"))
+    except (OSError, json.decoder.JSONDecodeError):
+        return default
+
+
+def write_json(json_file: Path, data: object, indent: int = None) -> None:
+    """
+    Replace the file in one step so a crash can not leave it half written.
+    """
+    temp_file = json_file.with_suffix(".tmp")
+    temp_file.write_text(json.dumps(data, ensure_ascii=False, indent=indent), encoding="utf-8")
+    temp_file.replace(json_file)
@@ -0,0 +1,76 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from time import monotonic
+from urllib.parse import urlparse
+
+import requests
+
+from utilities.http_client import HTTPClient
+
+logger = logging.getLogger(__name__)
+
+
+class LinkProber:
+    def __init__(self, max_workers: int = 8, alive_ttl: int = 600, dead_ttl: int = 1800, timeout: int = 10) -> None:
+        """
+        Check if links work without downloading them. Links are probed at the same time and the results are kept
+        for each host, so links checked by an earlier post or episode are not probed again.
+        :param alive_ttl: Seconds a working link is trusted for.
+        :param dead_ttl: Seconds a failed link is skipped for.
+        """
+        self.alive_ttl, self.dead_ttl, self.timeout = alive_ttl, dead_ttl, timeout
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix="link_prober")
+        self.results, self.lock = {}, Lock()  # Host as key and link results as value. Lock guards the results.
+
+    def get_result(self, link: str) -> bool | None:
+        """
+        :return: Whether the link works. None if it was not probed or the result expired.
+        """
+        with self.lock:
+            alive, checked_at = self.results.get(urlparse(link).netloc, {}).get(link, (None, 0))
+        ttl = self.alive_ttl if alive else self.dead_ttl
+        return alive if monotonic() - checked_at < ttl else None
+
+    def set_result(self, link: str, alive: bool) -> None:
+        with self.lock:
+            self.results.setdefault(urlparse(link).netloc, {})[link] = alive, monotonic()
+
+    def probe(self, link: str, headers: dict = None, remember_dead: bool = True) -> bool:
+        """
+        Send a HEAD request and fall back to a GET of the first byte for servers that do not answer HEAD requests.
+        The body of the GET is not read.
+        :param remember_dead: Whether a failed link is skipped by later checks. Working links are always kept.
+        """
+        session = HTTPClient.get_session()
+        try:
+            response = session.head(link, headers=headers, timeout=self.timeout, allow_redirects=True)
+            if not response.ok:
+                with session.get(link, headers={**(headers or {}), "Range": "bytes=0-0"}, timeout=self.timeout,
+                                 stream=True) as response:
+                    response.raise_for_status()
+            alive = True
+        except requests.RequestException as error:
+            logger.debug(f"Link: {link} failed test. Error: {error}")
+            alive = False
+        if alive or remember_dead:
+            self.set_result(link, alive)
+        return alive
+
+    def first_alive(self, links: list, headers: dict = None) -> str | None:
+        """
+        Probe the links at the same time and return the first working link in the order given.
+        Links after it are still probed in the background so their results are cached.
+        """
+        links = list(dict.fromkeys(links))
+        results = {link: self.get_result(link) for link in links}
+        futures = {link: self.executor.submit(self.probe, link, headers)
+                   for link, alive in results.items() if alive is None}
+        for link in links:
+            if link in futures:
+                results[link] = futures[link].result()
+            if results[link]:
+                return link
+
+    def close(self) -> None:
+        self.executor.shutdown(cancel_futures=True)
@@ -0,0 +1,171 @@
+import logging
+import re
+import time
+from threading import Lock
+from urllib.parse import urljoin
+
+import requests
+
+from utilities.http_client import HTTPClient
+
+logger = logging.getLogger(__name__)
+
+
+def parse_attributes(tag_line: str) -> dict:
+    """
+    Parse the attribute list of a playlist tag. e.g. #EXT-X-KEY:METHOD=AES-128,URI="key.key"
+    Quoted values may contain commas so a plain split can not be used.
+    """
+    attribute_text = tag_line.split(":", 1)[1] if ":" in tag_line else ""
+    attributes = re.findall(r'([A-Z0-9-]+)=("[^"]*"|[^,]*)', attribute_text)
+    return {name: value.strip('"') for name, value in attributes}
+
+
+class M3u8Variant:
+    def __init__(self, link: str, attributes: dict) -> None:
+        """
+        A variant stream of a master playlist.
+        :param link: The absolute link of the variant playlist.
+        :param attributes: The attributes of the #EXT-X-STREAM-INF tag.
+        """
+        self.link, self.attributes = link, attributes
+        self.bandwidth = int(attributes.get("BANDWIDTH") or 0)
+        self.width = self.height = None
+        if res_match := re.fullmatch(r"(\d+)x(\d+)", attributes.get("RESOLUTION", "")):
+            self.width, self.height = int(res_match.group(1)), int(res_match.group(2))
+
+    def __repr__(self) -> str:
+        return f"M3u8Variant(link={self.link}, resolution={self.width}x{self.height}, bandwidth={self.bandwidth})"
+
+    @property
+    def has_resolution(self) -> bool:
+        """
+        The declared resolution can be trusted when both the width and height are given.
+        """
+        return bool(self.width and self.height)
+
+
+class M3u8Playlist:
+    uri_tags = ("#EXT-X-KEY", "#EXT-X-MAP")  # Tags that reference a resource with a URI attribute.
+
+    def __init__(self, url: str, text: str, fetched_at: float = None) -> None:
+        """
+        Structured form of a m3u8 media or master playlist.
+        :param url: The link the playlist was fetched from. Relative links are resolved against it.
+        :param text: The playlist text.
+        :param fetched_at: The time the playlist was fetched.
+        """
+        # Line endings are normalised, the ad filter splits the text on \n.
+        self.url, self.text, self.fetched_at = url, "\n".join(text.splitlines()), fetched_at or time.time()
+        self.lines = [line.strip() for line in text.splitlines() if line.strip()]
+        self.segments, self.resources = [], []  # Resources are the key and init section files.
+        self.variants = []  # Variant streams of a master playlist.
+        self.parse()
+
+    def __repr__(self) -> str:
+        return (f"M3u8Playlist(url={self.url}, segments={len(self.segments)}, resources={len(self.resources)}, "
+                f"variants={len(self.variants)})")
+
+    @property
+    def is_master(self) -> bool:
+        return bool(self.variants)
+
+    def absolute_link(self, uri: str) -> str:
+        return urljoin(self.url, uri)
+
+    def parse(self) -> None:
+        """
+        Collect the segment, resource and variant links of the playlist as absolute links.
+        """
+        stream_attributes = None  # The link after a #EXT-X-STREAM-INF tag is a variant playlist.
+        for line in self.lines:
+            if line.startswith("#EXT-X-STREAM-INF"):
+                stream_attributes = parse_attributes(line)
+            elif line.startswith(self.uri_tags):
+                if uri := parse_attributes(line).get("URI"):
+                    self.resources.append(self.absolute_link(uri))
+            elif not line.startswith("#"):
+                if stream_attributes is None:
+                    self.segments.append(self.absolute_link(line))
+                else:
+                    self.variants.append(M3u8Variant(self.absolute_link(line), stream_attributes))
+                    stream_attributes = None
+
+    def best_variant(self) -> M3u8Variant | None:
+        """
+        Select the variant with the highest resolution then bandwidth. When no variant declares its
+        resolution the variant with the highest bandwidth is selected.
+        """
+        variants = [variant for variant in self.variants if variant.has_resolution] or self.variants
+        if variants:
+            return max(variants, key=lambda variant: (variant.height or 0, variant.bandwidth))
+
+    def localize(self, local_names: dict) -> str:
+        """
+        Return the playlist text with every segment and resource link replaced by its local file name.
+        :param local_names: Absolute links as keys and local file names as values.
+        """
+
+        def _sub(match: re.Match) -> str:
+            return f'URI="{local_names[self.absolute_link(match.group(1))]}"'
+
+        local_lines = []
+        for line in self.lines:
+            if line.startswith(self.uri_tags):
+                line = re.sub(r'URI="([^"]*)"', _sub, line)
+            elif not line.startswith("#"):
+                line = local_names[self.absolute_link(line)]
+            local_lines.append(line)
+        return "\n".join(local_lines) + "\n"
+
+
+class PlaylistCache:
+    def __init__(self, max_age: int = 600) -> None:
+        """
+        Playlists fetched during the run, so every step of a download uses the same fetched and parsed playlist.
+        :param max_age: Number of seconds before a playlist is fetched again. Signed links in it may have expired.
+        """
+        self.max_age, self.max_attempts = max_age, 3
+        self.playlists = {}  # Link as key and playlist as value. None is stored for links that are not playlists.
+        self.lock = Lock()
+
+    @staticmethod
+    def fetch(url: str, headers: dict = None) -> M3u8Playlist | None:
+        """
+        Fetch the link and return the playlist. The body of links that are not playlists is not fetched.
+        """
+        data = bytearray()
+        with HTTPClient.get_session().get(url, headers=headers, stream=True, timeout=(10, 60)) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(65536):
+                data.extend(chunk)
+                if len(data) >= 64 and not data.removeprefix(b"\xef\xbb\xbf").lstrip().startswith(b"#EXTM3U"):
+                    logger.debug(f"Link: {url} is not a playlist.")
+                    return
+        data = data.removeprefix(b"\xef\xbb\xbf")  # Some servers start the playlist with a UTF-8 BOM.
+        if data.lstrip().startswith(b"#EXTM3U"):
+            return M3u8Playlist(response.url, data.decode(errors="ignore"))
+
+    def get(self, url: str, headers: dict = None) -> M3u8Playlist | None:
+        """
+        Return the cached playlist of the link or fetch it if it is not cached or too old.
+        :return: The playlist or None if the link is not a playlist or could not be fetched.
+        """
+        with self.lock:
+            if url in self.playlists:
+                playlist = self.playlists[url]
+                if playlist is None or time.time() - playlist.fetched_at < self.max_age:
+                    return playlist
+                logger.debug(f"Cached playlist of {url} is too old and will be fetched again.")
+        for i in range(self.max_attempts):
+            try:
+                playlist = self.fetch(url, headers)
+                break
+            except requests.RequestException as error:
+                logger.warning(f"Attempt {i + 1}: Fetching playlist {url} failed, Error: {error}")
+                time.sleep(5)  # Wait before retrying
+        else:
+            return  # Failed fetches are not cached so they can be tried again.
+        with self.lock:
+            self.playlists[url] = playlist
+        return playlist
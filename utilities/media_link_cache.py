@@ -0,0 +1,47 @@
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+from threading import Lock
+
+from utilities.json_file import read_json, write_json
+
+logger = logging.getLogger(__name__)
+
+
+class MediaLinkCache:
+    def __init__(self, cache_file: Path) -> None:
+        """
+        Media links resolved from episode pages, kept across runs so episodes that failed to download are retried
+        without loading their episode pages again. Expired links are removed when the cache is loaded.
+        :param cache_file: JSON file the links are kept in.
+        """
+        self.cache_file, self.lock = cache_file, Lock()  # Lock guards the links.
+        self.links = self.load()  # Episode page url as key and media link details as value.
+
+    def load(self) -> dict:
+        links = read_json(self.cache_file, {})
+        now = datetime.now().isoformat()
+        return {video_url: link_details for video_url, link_details in links.items()
+                if link_details["expires_at"] > now}
+
+    def get(self, video_url: str) -> str | None:
+        with self.lock:
+            link_details = self.links.get(video_url)
+        if link_details and link_details["expires_at"] > datetime.now().isoformat():
+            return link_details["link"]
+
+    def set(self, video_url: str, download_link: str, ttl: int) -> None:
+        """
+        :param ttl: Seconds the link is used for. Sites that sign their links need a TTL shorter than the signature.
+        """
+        expires_at = (datetime.now() + timedelta(seconds=ttl)).isoformat()
+        with self.lock:
+            self.links[video_url] = {"link": download_link, "expires_at": expires_at}
+
+    def remove(self, video_url: str) -> None:
+        with self.lock:
+            self.links.pop(video_url, None)
+
+    def save(self) -> None:
+        with self.lock:
+            write_json(self.cache_file, self.links)
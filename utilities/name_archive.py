@@ -0,0 +1,84 @@
+import logging
+import re
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from threading import Lock
+from typing import Iterable
+
+logger = logging.getLogger(__name__)
+
+
+class NameArchive:
+    episode_pattern = re.compile(r"^(.*)EP(\d+)$")
+
+    def __init__(self, archive_file: Path, legacy_file: Path = None) -> None:
+        """
+        Archive of the resolved names that have been downloaded, stored in an indexed SQLite database.
+        The database is opened once and shared by the whole program, so membership checks do not depend on the
+        size of the archive and new names are written without rewriting the archive.
+        :param archive_file: The database file.
+        :param legacy_file: The old text archive with one resolved name per line. It is imported once.
+        """
+        self.archive_file, self.lock = archive_file, Lock()  # Lock guards the connection shared by the threads.
+        self.connection = sqlite3.connect(archive_file, check_same_thread=False)
+        # WAL needs memory shared between processes, which network shares do not support.
+        journal_mode = "DELETE" if str(archive_file).startswith("\\\\") else "WAL"
+        self.connection.execute(f"PRAGMA journal_mode={journal_mode}")
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS resolved_names (
+                name TEXT PRIMARY KEY, title TEXT NOT NULL, episode INTEGER, added_at TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS title_episode ON resolved_names (title, episode);
+            CREATE TABLE IF NOT EXISTS archive_info (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+        """)
+        if legacy_file:
+            self.migrate(legacy_file)
+
+    def split_name(self, resolved_name: str) -> tuple[str, int | None]:
+        """
+        Split the resolved name into the title and the episode number. The episode is None if it has no number.
+        """
+        if match := self.episode_pattern.match(resolved_name):
+            return match.group(1), int(match.group(2))
+        return resolved_name, None
+
+    def migrate(self, legacy_file: Path) -> None:
+        """
+        Import the names of the text archive the first time the database is used.
+        """
+        with self.lock:
+            if self.connection.execute("SELECT 1 FROM archive_info WHERE key = 'migrated_from'").fetchone():
+                return
+        names = legacy_file.read_text(encoding="utf-8").splitlines() if legacy_file.exists() else []
+        added = self.add(names)
+        with self.lock, self.connection:
+            self.connection.execute("INSERT INTO archive_info VALUES ('migrated_from', ?)", (str(legacy_file),))
+        logger.info(f"Resolved names archive migrated from {legacy_file.name}. Names imported: {len(added)}")
+
+    def __contains__(self, resolved_name: str) -> bool:
+        with self.lock:
+            query = "SELECT 1 FROM resolved_names WHERE name = ?"
+            return self.connection.execute(query, (resolved_name,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM resolved_names").fetchone()[0]
+
+    def add(self, resolved_names: Iterable[str]) -> list:
+        """
+        Add the names that are not in the archive yet.
+        :return: The names that were added.
+        """
+        names = list(dict.fromkeys(name.strip() for name in resolved_names if name.strip()))
+        added_at = datetime.now().isoformat(timespec="seconds")
+        with self.lock, self.connection:
+            added = [name for name in names if not self.connection.execute(
+                "SELECT 1 FROM resolved_names WHERE name = ?", (name,)).fetchone()]
+            self.connection.executemany("INSERT INTO resolved_names VALUES (?, ?, ?, ?)",
+                                        [(name, *self.split_name(name), added_at) for name in added])
+        return added
+
+    def close(self) -> None:
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,83 @@
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from utilities.json_file import read_json, write_json
+
+logger = logging.getLogger(__name__)
+
+
+class PageCache:
+    def __init__(self, cache_dir: Path, page_ttls: dict = None, max_age: timedelta = timedelta(days=7)) -> None:
+        """
+        Keep fetched pages on disk between runs. A page is used without a request while it is younger than the TTL
+        of its page type. Older pages fetched with HTTP are revalidated with their ETag and Last-Modified headers.
+        Pages rendered by the browser have no validators, so a content hash tells if the page changed.
+        :param cache_dir: The folder the pages are stored in.
+        :param page_ttls: Page type as key and the number of seconds a page of the type is used for as value.
+        :param max_age: Pages not fetched for longer than this are removed.
+        """
+        self.cache_dir, self.max_age = cache_dir, max_age
+        self.page_ttls = {"listing": 0, "post": 1800, "episode": 3600} | (page_ttls or {})
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.remove_stale()
+
+    def get_cache_file(self, url: str) -> Path:
+        return self.cache_dir / f"{hashlib.sha1(url.encode()).hexdigest()}.json"
+
+    @staticmethod
+    def get_content_hash(text: str) -> str:
+        return hashlib.sha1(text.encode()).hexdigest()
+
+    def get(self, url: str) -> dict | None:
+        return read_json(self.get_cache_file(url))
+
+    def is_fresh(self, entry: dict, page_type: str) -> bool:
+        age = datetime.now() - datetime.fromisoformat(entry["fetched_at"])
+        return age.total_seconds() < self.page_ttls.get(page_type, 0)
+
+    @staticmethod
+    def get_validators(entry: dict | None) -> dict:
+        """
+        Get the request headers that make the server answer with 304 Not Modified if the page has not changed.
+        """
+        validators = {}
+        if entry and entry.get("etag"):
+            validators["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            validators["If-Modified-Since"] = entry["last_modified"]
+        return validators
+
+    def write_entry(self, url: str, entry: dict) -> None:
+        try:
+            write_json(self.get_cache_file(url), entry)
+        except OSError as error:
+            logger.warning(f"Page of {url} could not be cached! Error: {error}")
+
+    def store(self, url: str, text: str, etag: str = None, last_modified: str = None) -> tuple[str, bool]:
+        """
+        Cache the page.
+        :return: The page text and whether it changed since it was last cached.
+        """
+        old_entry, content_hash = self.get(url), self.get_content_hash(text)
+        changed = not old_entry or old_entry["content_hash"] != content_hash
+        self.write_entry(url, {"url": url, "fetched_at": datetime.now().isoformat(), "etag": etag,
+                               "last_modified": last_modified, "content_hash": content_hash, "text": text})
+        return text, changed
+
+    def revalidated(self, url: str, entry: dict) -> tuple[str, bool]:
+        """
+        Mark the cached page as confirmed unchanged by the server.
+        """
+        self.write_entry(url, entry | {"fetched_at": datetime.now().isoformat()})
+        return entry["text"], False
+
+    def remove_stale(self) -> None:
+        removed = 0
+        for cache_file in self.cache_dir.glob("*.json"):
+            if datetime.now() - datetime.fromtimestamp(cache_file.stat().st_mtime) > self.max_age:
+                cache_file.unlink(missing_ok=True)
+                removed += 1
+        if removed:
+            logger.info(f"Stale cached pages removed: {removed}")
@@ -0,0 +1,141 @@
+import logging
+import re
+from datetime import date, timedelta
+from pathlib import Path
+from threading import Lock
+from typing import Callable
+from urllib.parse import urlparse
+
+import requests
+
+from utilities.http_client import HTTPClient
+from utilities.json_file import read_json, write_json
+from utilities.page_cache import PageCache
+
+logger = logging.getLogger(__name__)
+
+
+class PageFetcher:
+    # Texts only found on bot challenge pages. Normal pages of Cloudflare sites load challenge-platform scripts too.
+    challenge_markers = ("cf_chl_opt", "cf-browser-verification", "<title>Just a moment...",
+                         "<title>Attention Required! | Cloudflare", "<title>DDoS-Guard")
+
+    def __init__(self, modes_file: Path = None, recheck_days: int = 7, page_cache: PageCache = None) -> None:
+        """
+        Fetch pages with the shared HTTP session first and only use the browser when the response is a challenge
+        or placeholder page. The mode that worked is saved per site and url pattern, so later fetches of similar
+        pages go straight to the mode that works.
+        :param modes_file: JSON file the learned modes are kept in across runs.
+        :param recheck_days: Days after which HTTP is tried again for pages that needed the browser.
+        :param page_cache: When given, pages fetched with a page type are cached between runs.
+        """
+        self.modes_file, self.recheck_days, self.lock = modes_file, recheck_days, Lock()  # Lock guards the modes.
+        self.page_cache = page_cache
+        self.modes = self.load_modes()
+        self.digits_pattern = re.compile(r"\d+")
+
+    def load_modes(self) -> dict:
+        return read_json(self.modes_file, {}) if self.modes_file else {}
+
+    def save_modes(self) -> None:
+        """
+        Update the modes file. Must hold the lock.
+        """
+        if self.modes_file:
+            write_json(self.modes_file, self.modes, indent=2)
+
+    def get_url_pattern(self, url: str) -> tuple[str, str]:
+        """
+        Use the url to get the site and a pattern of the path shared by similar pages.
+        """
+        parsed_url = urlparse(url)
+        return parsed_url.netloc, self.digits_pattern.sub("#", parsed_url.path) or "/"
+
+    def get_mode(self, site: str, pattern: str) -> str | None:
+        with self.lock:
+            mode_details = self.modes.get(site, {}).get(pattern)
+        if not mode_details:
+            return None
+        checked = date.fromisoformat(mode_details["checked"])
+        if mode_details["mode"] == "browser" and date.today() - checked > timedelta(days=self.recheck_days):
+            return None  # The site may no longer need the browser.
+        return mode_details["mode"]
+
+    def set_mode(self, site: str, pattern: str, mode: str) -> None:
+        mode_details = {"mode": mode, "checked": date.today().isoformat()}
+        with self.lock:
+            old_details = self.modes.setdefault(site, {}).get(pattern, {})
+            if old_details == mode_details:
+                return
+            self.modes[site][pattern] = mode_details
+            if old_details.get("mode") != mode:
+                logger.info(f"Site: {site}, Url pattern: {pattern} fetch mode set to {mode}. "
+                            f"Old mode: {old_details.get('mode')}")
+            self.save_modes()
+
+    def is_challenge(self, response: requests.Response) -> bool:
+        """
+        Cloudflare marks its challenge responses with the cf-mitigated header, other challenges are found by text.
+        """
+        if response.headers.get("cf-mitigated") == "challenge":
+            return True
+        return any(marker in response.text for marker in self.challenge_markers)
+
+    def http_fetch(self, url: str, is_ready: Callable[[str], bool] = None,
+                   validators: dict = None) -> tuple[requests.Response | None, bool]:
+        """
+        Fetch the page with the shared HTTP session.
+        :param validators: Headers of a cached copy that let the server answer with 304 Not Modified.
+        :return: The response or None if it can not be used and whether the page needs a browser.
+        """
+        try:
+            response = HTTPClient.get_session().get(url, headers=validators, timeout=(10, 30))
+        except requests.RequestException as error:
+            logger.debug(f"HTTP fetch of {url} failed, Error: {error}")
+            return None, False
+        if response.status_code == 304:
+            return response, False
+        if self.is_challenge(response):
+            logger.debug(f"Challenge page returned for {url}. Status code: {response.status_code}")
+            return None, True
+        if not response.ok:
+            logger.debug(f"HTTP fetch of {url} failed. Status code: {response.status_code}")
+            return None, False
+        if "charset" not in response.headers.get("Content-Type", "").lower():
+            response.encoding = response.apparent_encoding  # Requests would decode the page as latin-1.
+        if is_ready and not is_ready(response.text):
+            logger.debug(f"Placeholder page returned for {url}, the page is loaded by scripts.")
+            return None, True
+        return response, False
+
+    def fetch_page(self, url: str, browser_fetch: Callable[[str], str], is_ready: Callable[[str], bool] = None,
+                   page_type: str = None) -> tuple[str, bool]:
+        """
+        Get the page text of the url with the mode learned for similar pages.
+        :param browser_fetch: Loads the url in a browser and returns the page source.
+        :param is_ready: Returns False for pages that are not usable before scripts run.
+        :param page_type: The type of page, used to pick how long a cached copy is used for. Not cached if None.
+        :return: The page text and whether the page changed since it was last cached.
+        """
+        entry = self.page_cache.get(url) if self.page_cache and page_type else None
+        if entry and self.page_cache.is_fresh(entry, page_type):
+            logger.debug(f"Cached page used for {url}")
+            return entry["text"], False
+        site, pattern = self.get_url_pattern(url)
+        if self.get_mode(site, pattern) != "browser":
+            response, needs_browser = self.http_fetch(url, is_ready, PageCache.get_validators(entry))
+            if response is not None:
+                self.set_mode(site, pattern, "http")
+                if response.status_code == 304:
+                    logger.debug(f"Cached page revalidated for {url}")
+                    return self.page_cache.revalidated(url, entry)
+                if self.page_cache and page_type:
+                    return self.page_cache.store(url, response.text, response.headers.get("ETag"),
+                                                 response.headers.get("Last-Modified"))
+                return response.text, True
+            if needs_browser:
+                self.set_mode(site, pattern, "browser")
+        page_text = browser_fetch(url)
+        if self.page_cache and page_type:
+            return self.page_cache.store(url, page_text)
+        return page_text, True
@@ -0,0 +1,70 @@
+import argparse
+import json
+import logging
+from importlib.util import find_spec
+from pathlib import Path
+from time import perf_counter
+
+from bs4 import BeautifulSoup
+
+from utilities.logger_setup import setup_logging
+
+logger = logging.getLogger(__name__)
+
+
+def load_saved_pages(pages_dir: Path) -> list:
+    """
+    Load the pages saved by the page cache and any html files in the folder.
+    """
+    pages = [json.loads(file.read_text(encoding="utf-8"))["text"] for file in pages_dir.glob("*.json")]
+    pages.extend(file.read_text(encoding="utf-8", errors="replace") for file in pages_dir.glob("*.html"))
+    return pages
+
+
+def time_parse(parse, pages: list, rounds: int) -> float:
+    """
+    :return: The average number of milliseconds taken to parse a page.
+    """
+    start = perf_counter()
+    for _ in range(rounds):
+        for page in pages:
+            parse(page)
+    return (perf_counter() - start) * 1000 / (rounds * len(pages))
+
+
+def benchmark_parsers(pages: list, parse_only: dict = None, rounds: int = 5) -> dict:
+    """
+    Compare the parsers that are installed on the same pages, parsing whole pages and parsing with the filters.
+    :param parse_only: Name as key and a SoupStrainer as value, like the scrappers' parse_only.
+    :return: Parser as key and the average milliseconds per page as value.
+    """
+    results = {}
+    backends = ["html.parser"] + [backend for backend in ("lxml",) if find_spec(backend)]
+    for backend in backends:
+        results[backend] = time_parse(lambda page: BeautifulSoup(page, backend), pages, rounds)
+        for name, strainer in (parse_only or {}).items():
+            results[f"{backend} ({name} only)"] = time_parse(
+                lambda page: BeautifulSoup(page, backend, parse_only=strainer), pages, rounds)
+    if find_spec("selectolax"):  # Not usable by the scrappers, only shows what the fastest parser costs.
+        from selectolax.parser import HTMLParser
+        results["selectolax"] = time_parse(HTMLParser, pages, rounds)
+    return results
+
+
+if __name__ == '__main__':
+    setup_logging()
+    arg_parser = argparse.ArgumentParser(description="Compare html parsers on saved pages.")
+    arg_parser.add_argument("pages_dir", type=Path, help="Folder with page cache files or html files.")
+    arg_parser.add_argument("--scrapper", help="Name of the scrapper class whose parse only filters are timed.")
+    arg_parser.add_argument("--rounds", type=int, default=5)
+    args = arg_parser.parse_args()
+    saved_pages = load_saved_pages(args.pages_dir)
+    if not saved_pages:
+        raise SystemExit(f"No saved pages found in {args.pages_dir}")
+    filters = None
+    if args.scrapper:
+        import scrapers
+        filters = getattr(scrapers, args.scrapper).parse_only
+    logger.info(f"Pages: {len(saved_pages)}, Rounds: {args.rounds}")
+    for parser_name, milliseconds in benchmark_parsers(saved_pages, filters, args.rounds).items():
+        logger.info(f"{parser_name}: {milliseconds:.2f} ms per page")
@@ -0,0 +1,177 @@
+import hashlib
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from threading import Event, Lock
+from time import perf_counter, sleep
+from urllib.parse import urlparse
+
+import requests
+
+from utilities.http_client import HTTPClient
+from utilities.m3u8_playlist import M3u8Playlist
+
+logger = logging.getLogger(__name__)
+
+
+class SegmentDownloader:
+    playlist_name, manifest_name, finished_log_name = "playlist.m3u8", "manifest.json", "finished.txt"
+
+    def __init__(self, playlist: M3u8Playlist, work_dir: Path, max_workers: int, headers: dict = None,
+                 timeout_secs: float = None, prefetched: dict = None, monitor=None, host: str = None) -> None:
+        """
+        Fetch the segments of a m3u8 playlist concurrently into a local folder.
+        A local playlist that points to the fetched files is written so ffmpeg can remux them.
+        Finished files are recorded in a log so an interrupted download only fetches the missing files later.
+        :param playlist: The media playlist with the segments to be fetched.
+        :param work_dir: The folder the segments will be saved in.
+        :param max_workers: The number of segments that will be fetched at the same time.
+        :param headers: Headers used for the segment requests.
+        :param timeout_secs: The time allowed for fetching all the segments.
+        :param prefetched: Segments that have already been fetched, the link as key and the data as value.
+        :param monitor: A ConcurrencyController that the fetched bytes and errors are reported to.
+        :param host: The host the download is scheduled under, the bytes and errors are reported for it.
+            The playlist host is used if None.
+        """
+        self.playlist, self.work_dir, self.max_workers = playlist, work_dir, max_workers
+        self.headers, self.prefetched, self.max_attempts = headers, prefetched or {}, 3
+        self.monitor, self.host = monitor, host or urlparse(playlist.url).netloc
+        self.deadline = perf_counter() + timeout_secs if timeout_secs else None
+        self.stop_flag = Event()  # Event to signal the other threads to stop after a failed segment.
+        self.manifest_file, self.manifest_lock = work_dir / self.manifest_name, Lock()
+        self.finished_log = work_dir / self.finished_log_name
+        self.finished_files, self.fingerprint = set(), self.get_fingerprint()
+        self.session = HTTPClient.get_session()  # Workers reuse the pooled keep-alive connections to the host.
+
+    def get_local_names(self) -> dict:
+        """
+        Give every segment and resource of the playlist a local file name.
+        """
+        local_names = {link: f"resource_{i}{Path(link.split('?')[0]).suffix or '.key'}"
+                       for i, link in enumerate(dict.fromkeys(self.playlist.resources))}
+        for i, link in enumerate(dict.fromkeys(self.playlist.segments)):
+            local_names[link] = f"segment_{i:05d}.ts"
+        return local_names
+
+    def get_fingerprint(self) -> str:
+        """
+        Identify the playlist by its segment links without the query strings, signed links change between runs.
+        """
+        links = "\n".join(link.split("?")[0] for link in self.playlist.segments)
+        return hashlib.sha1(links.encode()).hexdigest()
+
+    def load_manifest(self) -> None:
+        """
+        Load the files finished by a previous attempt. Previous files are removed if the playlist has changed.
+        The manifest identifies the playlist and the finished files are read from the finished log.
+        """
+        if self.manifest_file.exists():
+            try:
+                manifest = json.loads(self.manifest_file.read_text())
+            except json.decoder.JSONDecodeError:
+                manifest = {}
+            if manifest.get("fingerprint") == self.fingerprint:
+                logged_names = self.finished_log.read_text().splitlines() if self.finished_log.exists() else []
+                # A name cut short by a crash is dropped because no file has that name.
+                finished_names = [*manifest.get("finished", []), *logged_names]  # Older manifests list the files.
+                self.finished_files = {name for name in finished_names if (self.work_dir / name).exists()}
+                logger.info(f"Resuming {self.work_dir.name}, {len(self.finished_files)} file(s) already fetched.")
+                return
+            logger.warning(f"Playlist of {self.work_dir.name} has changed. Previously fetched files will be removed.")
+            for file in self.work_dir.iterdir():
+                file.unlink(missing_ok=True)
+        self.finished_files = set()
+        self.finished_log.unlink(missing_ok=True)
+        temp_manifest = self.manifest_file.with_name(f"{self.manifest_name}.part")
+        temp_manifest.write_text(json.dumps({"fingerprint": self.fingerprint}))
+        temp_manifest.replace(self.manifest_file)
+
+    def update_manifest(self, finished_file: str) -> None:
+        """
+        Record a finished file by appending it to the finished log, the cost does not grow with the playlist.
+        """
+        with self.manifest_lock:
+            self.finished_files.add(finished_file)
+            with open(self.finished_log, "a") as finished_log:
+                finished_log.write(f"{finished_file}\n")
+
+    def discard(self, name: str) -> None:
+        """
+        Remove a finished file that turned out to be bad, so the next attempt fetches it again.
+        """
+        with self.manifest_lock:
+            self.finished_files.discard(name)
+            logged_names = self.finished_log.read_text().splitlines() if self.finished_log.exists() else []
+            logged_names = [logged for logged in logged_names if logged != name]
+            temp_log = self.finished_log.with_name(f"{self.finished_log_name}.part")
+            temp_log.write_text("".join(f"{logged}\n" for logged in logged_names))
+            temp_log.replace(self.finished_log)
+            (self.work_dir / name).unlink(missing_ok=True)
+
+    def save_prefetched(self, local_names: dict) -> None:
+        """
+        Save the prefetched segments that are part of the playlist and have not been fetched yet.
+        """
+        for link, data in self.prefetched.items():
+            name = local_names.get(link)
+            if name and name not in self.finished_files:
+                temp_file = self.work_dir / f"{name}.part"
+                temp_file.write_bytes(data)
+                temp_file.replace(self.work_dir / name)
+                self.update_manifest(name)
+                logger.debug(f"Prefetched segment saved as {name} in {self.work_dir.name}.")
+
+    def fetch_file(self, link: str, file: Path) -> None:
+        """
+        Fetch a single file. The file is written under a temporary name and renamed when complete.
+        """
+        temp_file = file.with_name(f"{file.name}.part")
+        for i in range(self.max_attempts):
+            if self.stop_flag.is_set():
+                return
+            if self.deadline and perf_counter() > self.deadline:
+                raise TimeoutError(f"Time allowed for fetching segments exceeded. Link: {link}")
+            try:
+                with self.session.get(link, headers=self.headers, stream=True, timeout=(10, 60)) as response:
+                    response.raise_for_status()
+                    with open(temp_file, "wb") as segment_file:
+                        for chunk in response.iter_content(chunk_size=65536):
+                            segment_file.write(chunk)
+                            if self.monitor:
+                                self.monitor.record_bytes(self.host, len(chunk), self.work_dir.name)
+                temp_file.replace(file)
+                self.update_manifest(file.name)
+                return
+            except requests.RequestException as error:
+                logger.debug(f"Attempt {i + 1}: Fetching {link} failed, Error: {error}")
+                if self.monitor:
+                    self.monitor.record_error(self.host)
+                sleep(2)  # Wait before retrying
+        raise ConnectionError(f"Fetching {link} failed after {self.max_attempts} attempts!")
+
+    def download(self) -> Path:
+        """
+        Fetch all the files of the playlist and return the local playlist.
+        """
+        self.work_dir.mkdir(exist_ok=True)
+        self.load_manifest()
+        local_names, start = self.get_local_names(), perf_counter()
+        self.save_prefetched(local_names)
+        missing_names = {link: name for link, name in local_names.items() if name not in self.finished_files}
+        logger.debug(f"Fetching {len(missing_names)} of {len(local_names)} files into {self.work_dir.name} "
+                     f"with {self.max_workers} workers.")
+        executor = ThreadPoolExecutor(self.max_workers)
+        try:
+            futures = [executor.submit(self.fetch_file, link, self.work_dir / name)
+                       for link, name in missing_names.items()]
+            for f in as_completed(futures):
+                if error := f.exception():
+                    self.stop_flag.set()
+                    raise error
+        finally:
+            executor.shutdown(cancel_futures=True)
+        local_playlist = self.work_dir / self.playlist_name
+        local_playlist.write_text(self.playlist.localize(local_names))
+        logger.debug(f"Files for {self.work_dir.name} fetched. Duration: {round(perf_counter() - start)}s")
+        return local_playlist
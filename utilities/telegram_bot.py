@@ -1,7 +1,7 @@
 import json
 import logging
 
-import requests
+from utilities.http_client import HTTPClient
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +19,7 @@ class TelegramBot:
         api_url = f'https://api.telegram.org/bot{self.bot_token}/sendMessage'
         data = {'chat_id': self.chat_id, 'text': message}
         try:
-            response = requests.post(api_url, data=data)
+            response = HTTPClient.get_session().post(api_url, data=data)
             response.raise_for_status()
             logger.debug(f"Telegram message sent. Response: {response.text}")
         except Exception as error:
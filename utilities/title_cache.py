@@ -0,0 +1,78 @@
+import hashlib
+import logging
+from collections import OrderedDict
+from importlib.util import find_spec
+from pathlib import Path
+from threading import Lock
+
+from ch_title_gen import ChineseTitleGenerator
+
+from utilities.json_file import read_json, write_json
+
+logger = logging.getLogger(__name__)
+
+
+class TitleCache:
+    def __init__(self, cache_file: Path = None, max_size: int = 5000) -> None:
+        """
+        Bounded LRU cache of the names resolved by the title generator. Most titles are resolved again on every run,
+        so the cache can be saved between runs. A saved cache is dropped when the title generator changes.
+        :param cache_file: JSON file the cache is kept in across runs. The cache is only kept in memory if None.
+        :param max_size: The max number of resolved names kept. The least recently used are removed first.
+        """
+        self.cache_file, self.max_size, self.lock = cache_file, max_size, Lock()  # Lock guards the titles.
+        self.generator, self.generator_version = ChineseTitleGenerator(), self.get_generator_version()
+        self.titles = OrderedDict()  # Anime name and video title as key and resolved name as value.
+        self.hits = self.misses = 0
+        self.load()
+
+    @staticmethod
+    def get_generator_version() -> str:
+        """
+        Hash the source of the title generator. The package is installed from git, so its version number does not
+        always change when its rules do.
+        """
+        spec, digest = find_spec("ch_title_gen"), hashlib.sha1()
+        if spec and spec.submodule_search_locations:
+            source_files = sorted(file for location in spec.submodule_search_locations
+                                  for file in Path(location).rglob("*.py"))
+        else:
+            source_files = [Path(spec.origin)] if spec and spec.origin else []
+        for source_file in source_files:
+            digest.update(source_file.read_bytes())
+        return digest.hexdigest()
+
+    def load(self) -> None:
+        cache_details = read_json(self.cache_file) if self.cache_file else None
+        if not cache_details:
+            return
+        if cache_details.get("generator_version") != self.generator_version:
+            logger.info("Title generator has changed. Saved resolved names will not be used.")
+            return
+        for anime_name, video_title, resolved_name in cache_details["titles"][-self.max_size:]:
+            self.titles[anime_name, video_title] = resolved_name
+
+    def save(self) -> None:
+        logger.info(f"Title cache hits: {self.hits}, misses: {self.misses}, Resolved names cached: {len(self.titles)}")
+        if self.cache_file:
+            with self.lock:
+                titles = [[*key, resolved_name] for key, resolved_name in self.titles.items()]
+            write_json(self.cache_file, {"generator_version": self.generator_version, "titles": titles})
+
+    def generate_title(self, video_title: str, anime_name: str) -> str:
+        """
+        Same as the title generator's generate_title, resolved names that were generated before are reused.
+        """
+        key = anime_name, video_title
+        with self.lock:
+            if key in self.titles:
+                self.hits += 1
+                self.titles.move_to_end(key)
+                return self.titles[key]
+        resolved_name = self.generator.generate_title(video_title, anime_name)
+        with self.lock:
+            self.misses += 1
+            self.titles[key] = resolved_name
+            while len(self.titles) > self.max_size:
+                self.titles.popitem(last=False)
+        return resolved_name
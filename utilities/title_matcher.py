@@ -0,0 +1,63 @@
+from collections import deque
+from typing import Iterable
+
+
+class TitleMatcher:
+    def __init__(self, names: Iterable[str]) -> None:
+        """
+        Find which names of the watchlist appear in a title with one pass over the title. The names are compiled
+        once into an Aho-Corasick automaton, so the cost of matching a title does not grow with the watchlist.
+        :param names: The anime names. Duplicate names are only matched once.
+        """
+        self.names = list(dict.fromkeys(names))
+        # Each state has its transitions, its fail state and the indexes of the names that end on it.
+        self.transitions, self.fail_states, self.outputs = [{}], [0], [[]]
+        for name_index, name in enumerate(self.names):
+            self.add_name(name_index, name)
+        self.link_fail_states()
+
+    def add_name(self, name_index: int, name: str) -> None:
+        state = 0
+        for char in name:
+            if char not in self.transitions[state]:
+                self.transitions.append({})
+                self.fail_states.append(0)
+                self.outputs.append([])
+                self.transitions[state][char] = len(self.transitions) - 1
+            state = self.transitions[state][char]
+        self.outputs[state].append(name_index)
+
+    def link_fail_states(self) -> None:
+        """
+        Point every state to the state of its longest suffix that is also a name prefix, so matching continues
+        after a mismatch without going back in the title. A state also outputs the names ending on its fail state.
+        """
+        queue = deque(self.transitions[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.transitions[state].items():
+                fail_state = self.fail_states[state]
+                while fail_state and char not in self.transitions[fail_state]:
+                    fail_state = self.fail_states[fail_state]
+                self.fail_states[next_state] = self.transitions[fail_state].get(char, 0)
+                self.outputs[next_state] = self.outputs[next_state] + self.outputs[self.fail_states[next_state]]
+                queue.append(next_state)
+
+    def find_indexes(self, title: str) -> set:
+        name_indexes, state = set(self.outputs[0]), 0  # Root outputs are empty names, they are in every title.
+        for char in title:
+            while state and char not in self.transitions[state]:
+                state = self.fail_states[state]
+            state = self.transitions[state].get(char, 0)
+            name_indexes.update(self.outputs[state])
+        return name_indexes
+
+    def match(self, titles: Iterable[str]) -> list:
+        """
+        Match every title in one pass each.
+        :return: Name and title index pairs ordered by name in watchlist order and then by title index, the same
+            order as checking each name against every title.
+        """
+        matches = sorted((name_index, title_index) for title_index, title in enumerate(titles)
+                         for name_index in self.find_indexes(title))
+        return [(self.names[name_index], title_index) for name_index, title_index in matches]
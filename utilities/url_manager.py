@@ -2,9 +2,10 @@ import json
 import logging
 import re
 
-import requests
 from requests.exceptions import ConnectionError, HTTPError, ReadTimeout
 
+from utilities.http_client import HTTPClient
+
 logger = logging.getLogger(__name__)
 
 
@@ -38,7 +39,7 @@ class URLManager:
         Check if the url works and catch any error that may occur when testing url.
         """
         try:
-            response = requests.get(f"http://{url}", headers=self.headers, timeout=6)
+            response = HTTPClient.get_session().get(f"http://{url}", headers=self.headers, timeout=6)
             response.raise_for_status()
             site_name = self.site_name_pattern.search(response.url).group(1)
             return site_name
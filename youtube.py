@@ -11,16 +11,21 @@ from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 
+from utilities.name_archive import NameArchive
+from utilities.title_cache import TitleCache
+from utilities.title_matcher import TitleMatcher
+
 logger = logging.getLogger(__name__)
 
 
 # This class makes calls to the YouTube API.
 class YouTube:
     credential_file = token_file = Path()
+    title_cache: TitleCache | None = None  # Resolved names, shared with the scrappers. Must be set before matching.
 
-    def __init__(self, playlist_id: str, resolved_names_file: Path) -> None:
+    def __init__(self, playlist_id: str, name_archive: NameArchive) -> None:
         self.playlist_id = playlist_id
-        self.resolved_names_file = resolved_names_file
+        self.name_archive = name_archive
         self.youtube = None
         self.max_results = 50
         self.default_duration = timedelta(hours=12)
@@ -208,33 +213,29 @@ class YouTube:
         :return: Dictionary containing the video id as key and video title as value.
         """
         logger.info("..........Checking archive for resolved name matches..........")
-        resolved_names_archive = set(self.resolved_names_file.read_text(encoding="utf-8").splitlines())
         archive_checked_videos, new_resolved_names = {}, []
         for video_id, video_details in quality_checked_videos.items():
             resolved_name, video_title = video_details[0], video_details[1]
-            if resolved_name in resolved_names_archive:
+            if resolved_name in self.name_archive:
                 logger.warning(f"Video ID: {video_id}, Resolved name: {resolved_name} is already in the archive.")
             elif self.ch_name_gen.episode_range_pattern.search(video_title):
                 resolved_name_range = resolved_name.split("EP")
                 resolved_name_episodes = resolved_name_range[1].split("-")
                 resolved_name_1 = f"{resolved_name_range[0]}EP{resolved_name_episodes[0]}"
                 resolved_name_2 = f"{resolved_name_range[0]}EP{resolved_name_episodes[1]}"
-                if resolved_name_1 in resolved_names_archive or resolved_name_2 in resolved_names_archive:
+                if resolved_name_1 in self.name_archive or resolved_name_2 in self.name_archive:
                     logger.warning(f"Video ID: {video_id}, Part of resolved name: {resolved_name} already in archive.")
                 else:
                     logger.info(f"Video ID: {video_id}, Resolved name: {resolved_name} is being added to the archive.")
                     archive_checked_videos[video_id] = video_title
-                    if resolved_name_1 not in resolved_names_archive:
-                        new_resolved_names.append(resolved_name_1 + "\n")
-                    new_resolved_names.append(resolved_name_2 + "\n")
+                    new_resolved_names.extend([resolved_name_1, resolved_name_2])
             else:
                 logger.info(f"Video ID: {video_id}, Resolved name: {resolved_name} is being added to the archive.")
                 archive_checked_videos[video_id] = video_title
-                new_resolved_names.append(resolved_name + "\n")
+                new_resolved_names.append(resolved_name)
         if new_resolved_names:
+            new_resolved_names = self.name_archive.add(new_resolved_names)
             logger.info(f"Archive updated with new names. Names: {new_resolved_names}")
-            with open(self.resolved_names_file, 'a', encoding="utf-8") as text_file:
-                text_file.writelines(new_resolved_names)
         return archive_checked_videos
 
     def get_all_channel_uploads(self, youtube_channel_ids: list) -> dict:
@@ -271,19 +272,21 @@ class YouTube:
             logger.info("No recent video uploads!")
             return
         logger.info("..........Checking for video matches..........")
-        matched_videos = {}
-        for anime_name in anime_names:
-            for video_id, video_title in all_recent_uploads.items():
-                if anime_name in video_title:  # Match found.
-                    resolved_name = self.ch_name_gen.generate_title(video_title, anime_name)
-                    logger.info(f"Anime name: {anime_name} matches Video ID: {video_id}, Video Title: {video_title}")
-                    # Prevent matching video with same name from different channels.
-                    if resolved_name not in list(matched_videos.values()):
-                        logger.info(f"Video ID: {video_id}, Resolved name: {resolved_name} added to matches.")
-                        matched_videos[video_id] = resolved_name
-                    else:
-                        logger.warning(f"Video ID: {video_id}, "
-                                       f"Resolved name: {resolved_name} already exists in matches, will not be added.")
+        matched_videos, matched_names = {}, set()  # Matched names are the resolved names of the matched videos.
+        video_ids, video_titles = list(all_recent_uploads), list(all_recent_uploads.values())
+        for anime_name, video_index in TitleMatcher(anime_names).match(video_titles):
+            video_id, video_title = video_ids[video_index], video_titles[video_index]
+            resolved_name = self.title_cache.generate_title(video_title, anime_name)
+            logger.info(f"Anime name: {anime_name} matches Video ID: {video_id}, Video Title: {video_title}")
+            # Prevent matching video with same name from different channels. Uploads are in channel order.
+            if resolved_name not in matched_names:
+                logger.info(f"Video ID: {video_id}, Resolved name: {resolved_name} added to matches.")
+                matched_names.discard(matched_videos.get(video_id))  # A later name can replace the video's match.
+                matched_videos[video_id] = resolved_name
+                matched_names.add(resolved_name)
+            else:
+                logger.warning(f"Video ID: {video_id}, "
+                               f"Resolved name: {resolved_name} already exists in matches, will not be added.")
         self.check_matches(matched_videos)
         end = time.perf_counter()
         logger.info(f"Time matching recent uploads and adding to playlist took: {round(end - start)}s")